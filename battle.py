@@ -3,20 +3,30 @@ Contains the battle logic, allowing 2 PokeTeams to fight and returning a winner
 """
 __author__ = "Scaffold by Jackson Goerner, Code by Chai Wai Jin, Hang Jui Kai & Jeremy To Jun Wei"
 
+import os
 from random_gen import RandomGen
 from poke_team import Action, PokeTeam, Criterion
 from print_screen import print_game_screen
+from turn_log import TurnLog, JSON_LINES
 from pokemon_base import PokemonBase
 
 class Battle:
     
-    def __init__(self, verbosity=0) -> None:
+    def __init__(self, verbosity=0, renderer=None, turn_log=None) -> None:
         """Initialization
 
-        :param args: an integer to indicate whether to print screen
+        :param args1: an integer to indicate whether to print screen, JSON_LINES writes every turn to turn_log instead
+        :param args2: a RenderThread that draws the turns instead, so the battle does not wait for the terminal
+        :param args3: a TurnLog every turn is written to, the standard output if verbosity is JSON_LINES and it is None
         :complexity:
         """
         self.verbosity = verbosity
+        self.renderer = renderer
+        if verbosity == JSON_LINES and turn_log is None:
+            turn_log = TurnLog()
+        self.turn_log = turn_log
+        self.turn_count = 0
+        self.battle_id = -1
 
     def battle(self, team1: PokeTeam, team2: PokeTeam) -> int:
         """ Performs a battle between team1 and team2
@@ -27,17 +37,28 @@ class Battle:
         :complexity: Best O(T) when it is battle_mode 0 or 1 for both teams, Worst O(T(n+m)) when it is battle_mode 2
                      for both teams, where T is the total number of turns, n is len(team1.pokemon_team_lst), and m is
                      len(team2.pokemon_team_lst).
+
+        The number of turns played is kept in turn_count.
+        """
+        self.turn_count = 0
+        if self.turn_log is not None:
+            self.battle_id = self.turn_log.start_battle()
+        battle_res = self._battle(team1, team2)
+        if self.turn_log is not None:
+            self.turn_log.write_result(self.battle_id, self.turn_count, battle_res)
+        return battle_res
+
+    def _battle(self, team1: PokeTeam, team2: PokeTeam) -> int:
+        """ Plays the turns of a battle, see battle
         """
         pokemon1 = team1.retrieve_pokemon()
         pokemon2 = team2.retrieve_pokemon()
 
-        if self.verbosity != 0:
-            print_game_screen(pokemon1.get_poke_name(), pokemon2.get_poke_name(), pokemon1.get_hp(), pokemon1.get_max_hp(),
-                              pokemon2.get_hp(), pokemon2.get_max_hp(), pokemon1.get_level(), pokemon2.get_level(),
-                              pokemon1.get_status(), pokemon2.get_status(), len(team1.poke_team_lst) + 1,
-                              len(team2.poke_team_lst) + 1)
+        if self.verbosity != 0 or self.renderer is not None or self.turn_log is not None:
+            self._show_turn(team1, team2, pokemon1, pokemon2)
 
         while True:
+            self.turn_count += 1
             team1_action = team1.choose_battle_option(pokemon1, pokemon2)
             team2_action = team2.choose_battle_option(pokemon2, pokemon1)
 
@@ -48,6 +69,7 @@ class Battle:
             elif team1_action == Action.HEAL:
                 self._perform_heal(team1, pokemon1)
                 if team1.get_heal_count() > 3:
+                    self._show_last_turn(team1, team2, pokemon1, pokemon2, team1_action, team2_action)
                     return 2
 
             if team2_action == Action.SWAP:
@@ -57,6 +79,7 @@ class Battle:
             elif team2_action == Action.HEAL:
                 self._perform_heal(team2, pokemon2)
                 if team2.get_heal_count() > 3:
+                    self._show_last_turn(team1, team2, pokemon1, pokemon2, team1_action, team2_action)
                     return 1
 
             if team1_action == Action.ATTACK and team2_action == Action.ATTACK:
@@ -97,9 +120,11 @@ class Battle:
                 try:
                     pokemon2 = team2.retrieve_pokemon()
                 except Exception as e:
+                    self._show_last_turn(team1, team2, pokemon1, pokemon2, team1_action, team2_action)
                     team1.return_pokemon(pokemon1)
                     return 1
                 except IndexError as e:
+                    self._show_last_turn(team1, team2, pokemon1, pokemon2, team1_action, team2_action)
                     team1.return_pokemon(pokemon1)
                     return 1
             elif pokemon1.is_fainted() and not pokemon2.is_fainted():
@@ -112,27 +137,69 @@ class Battle:
                 try:
                     pokemon1 = team1.retrieve_pokemon()
                 except Exception as e:
+                    self._show_last_turn(team1, team2, pokemon1, pokemon2, team1_action, team2_action)
                     team2.return_pokemon(pokemon2)
                     return 2
                 except IndexError as e:
+                    self._show_last_turn(team1, team2, pokemon1, pokemon2, team1_action, team2_action)
                     team2.return_pokemon(pokemon2)
                     return 2
             elif pokemon1.is_fainted() and pokemon2.is_fainted():
                 if team1.is_empty() and team2.is_empty():
+                    self._show_last_turn(team1, team2, pokemon1, pokemon2, team1_action, team2_action)
                     return 0
                 elif not team1.is_empty() and team2.is_empty():
+                    self._show_last_turn(team1, team2, pokemon1, pokemon2, team1_action, team2_action)
                     return 1
                 elif team1.is_empty() and not team2.is_empty():
+                    self._show_last_turn(team1, team2, pokemon1, pokemon2, team1_action, team2_action)
                     return 2
                 elif not team1.is_empty() and not team2.is_empty():
                     pokemon1 = team1.retrieve_pokemon()
                     pokemon2 = team2.retrieve_pokemon()
 
-            if self.verbosity != 0:
-                print_game_screen(pokemon1.get_poke_name(), pokemon2.get_poke_name(), pokemon1.get_hp(), pokemon1.get_max_hp(),
-                                  pokemon2.get_hp(), pokemon2.get_max_hp(), pokemon1.get_level(), pokemon2.get_level(),
-                                  pokemon1.get_status(), pokemon2.get_status(), len(team1.poke_team_lst)+1,
-                                  len(team2.poke_team_lst)+1)
+            if self.verbosity != 0 or self.renderer is not None or self.turn_log is not None:
+                self._show_turn(team1, team2, pokemon1, pokemon2, (team1_action.name, team2_action.name))
+
+    def _show_turn(self, team1: PokeTeam, team2: PokeTeam, pokemon1: PokemonBase, pokemon2: PokemonBase,
+                   actions=None) -> None:
+        """ Logs the current turn, and draws it or hands a snapshot of it to the renderer
+
+        :param args5: names of the actions the teams chose this turn, None before the first turn
+        :complexity: Best/Worst O(1) with a renderer or JSON_LINES, otherwise the cost of print_game_screen
+        """
+        if self.turn_log is not None:
+            self.turn_log.write_turn(self.battle_id, self.turn_count, actions, self._side_record(team1, pokemon1),
+                                     self._side_record(team2, pokemon2))
+        if self.renderer is None and self.verbosity in (0, JSON_LINES):
+            return
+
+        snapshot = (pokemon1.get_poke_name(), pokemon2.get_poke_name(), pokemon1.get_hp(), pokemon1.get_max_hp(),
+                    pokemon2.get_hp(), pokemon2.get_max_hp(), pokemon1.get_level(), pokemon2.get_level(),
+                    pokemon1.get_status(), pokemon2.get_status(), len(team1.poke_team_lst)+1,
+                    len(team2.poke_team_lst)+1)
+        if self.renderer is not None:
+            self.renderer.submit(snapshot)
+        else:
+            print_game_screen(*snapshot)
+
+    def _show_last_turn(self, team1: PokeTeam, team2: PokeTeam, pokemon1: PokemonBase, pokemon2: PokemonBase,
+                        team1_action: Action, team2_action: Action) -> None:
+        """ Logs and draws the turn that decided the battle, which ends before the end of its loop
+
+        :complexity: same as _show_turn
+        """
+        if self.verbosity != 0 or self.renderer is not None or self.turn_log is not None:
+            self._show_turn(team1, team2, pokemon1, pokemon2, (team1_action.name, team2_action.name))
+
+    def _side_record(self, team: PokeTeam, pokemon: PokemonBase) -> dict:
+        """ Returns the turn log record of a team's current pokemon
+
+        :complexity: Best/Worst O(1)
+        """
+        return {"species": pokemon.get_poke_name(), "hp": pokemon.get_hp(), "max_hp": pokemon.get_max_hp(),
+                "level": pokemon.get_level(), "status": pokemon.get_status(),
+                "remaining": len(team.poke_team_lst) + 1}
 
     def _perform_swap(self, team: PokeTeam, pokemon: PokemonBase) -> PokemonBase:
         """ Returns to current pokemon and retrieves a pokemon from the team (could be the same pokemon)
@@ -201,6 +268,29 @@ class Battle:
             pokemon.set_speed(pokemon.get_speed()//2)
         return pokemon
 
+
+def battle_codes(team1_code: int, team2_code: int, seed: int, board=None) -> int:
+    """ Performs a battle between two freshly generated teams given by their configuration codes
+
+    :param args1: configuration code of the first team
+    :param args2: configuration code of the second team
+    :param args3: seed for RandomGen, so the result only depends on the arguments
+    :param args4: a BattleBoard, or the BoardChannel of one in a worker process, to show the battle on
+    :complexity: same as Battle.battle
+
+    This function is kept at module level so process pools can send it to their workers. On a board, every process
+    has one panel, keyed by its process id, which shows the battle it is playing or the result of its last one.
+    """
+    RandomGen.set_seed(seed)
+    team1 = PokeTeam.from_config_code("Team 1", team1_code)
+    team2 = PokeTeam.from_config_code("Team 2", team2_code)
+    if board is None:
+        return Battle().battle(team1, team2)
+    slot = board.slot(os.getpid(), f"{team1_code} vs {team2_code}")
+    battle_res = Battle(renderer=slot).battle(team1, team2)
+    slot.finish(battle_res)
+    return battle_res
+
         
 if __name__ == "__main__":
     b = Battle(verbosity=3)
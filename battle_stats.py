@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+"""
+Statistics for summarising many battle results.
+"""
+
+import math
+import threading
+from pokemon_base import PokeType
+from poke_team import PokeTeam
+
+Z_95 = 1.959963984540054
+
+def wilson_interval(successes: int, trials: int, z: float = Z_95) -> tuple[float, float]:
+    """ Returns the Wilson score interval of a proportion
+
+        :param arg1: number of successes
+        :param arg2: number of trials
+        :param arg3: z score of the confidence level, 95% by default
+        :complexity: Best/Worst O(1)
+
+        Unlike the normal approximation, the interval stays inside [0, 1] and is still useful when there are no
+        successes or no failures, which is common for lopsided matchups. (0, 1) is returned when there are no trials.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+class BattleStats:
+    """ Running statistics of a team's battles, updated one battle at a time.
+
+        Attributes:
+            played, won, drawn, lost (int): number of battles with each result
+            streak, losing_streak (int): current number of wins and losses in a row
+            longest_streak (int): most wins in a row so far
+            longest_losing_streak (int): most losses in a row so far
+            turns (dict[int, int]): number of battles that took each number of turns
+            total_turns (int): number of turns over all battles
+            by_mode, by_criterion, by_type (dict): [won, drawn, lost] against opponents of each battle mode, criterion
+                and dominant type
+
+        Every statistic only needs the last result, so adding a battle is O(1) and a snapshot can be taken at any time
+        while the battles go on. add, settled and snapshot hold a lock, so a snapshot taken from another thread never
+        sees a battle half added.
+    """
+
+    def __init__(self) -> None:
+        """ Initialisation
+
+            :complexity: Best/Worst O(1)
+        """
+        self.played = 0
+        self.won = 0
+        self.drawn = 0
+        self.lost = 0
+        self.streak = 0
+        self.losing_streak = 0
+        self.longest_streak = 0
+        self.longest_losing_streak = 0
+        self.turns = {}
+        self.total_turns = 0
+        self.by_mode = {}
+        self.by_criterion = {}
+        self.by_type = {}
+        self.lock = threading.Lock()
+
+    def add(self, battle_res: int, turns: int = 0, opponent_code: int | None = None) -> None:
+        """ Adds the result of a battle.
+
+            :param arg1: the result of the battle, 1 if the team won, 2 if it lost and 0 for a draw
+            :param arg2: number of turns the battle took, see Battle.turn_count
+            :param arg3: configuration code of the opponent, see PokeTeam.encode_config, for the breakdowns
+            :complexity: Best/Worst O(1)
+        """
+        keys = None
+        if opponent_code is not None:
+            team_numbers, battle_mode, _, criterion = PokeTeam.decode_config(opponent_code)
+            dominant = PokeType(team_numbers.index(max(team_numbers))).name
+            keys = (battle_mode, None if criterion is None else criterion.name, dominant)
+
+        with self.lock:
+            self._add(battle_res, turns, keys)
+
+    def _add(self, battle_res: int, turns: int, keys: tuple | None) -> None:
+        """ Adds the result of a battle, with the lock held.
+
+            :param arg3: the battle mode, criterion name and dominant type of the opponent, None if it is unknown
+            :complexity: Best/Worst O(1)
+        """
+        self.played += 1
+        if battle_res == 1:
+            self.won += 1
+            self.streak += 1
+            self.losing_streak = 0
+            self.longest_streak = max(self.longest_streak, self.streak)
+        elif battle_res == 2:
+            self.lost += 1
+            self.losing_streak += 1
+            self.streak = 0
+            self.longest_losing_streak = max(self.longest_losing_streak, self.losing_streak)
+        else:
+            self.drawn += 1
+        self.turns[turns] = self.turns.get(turns, 0) + 1
+        self.total_turns += turns
+
+        if keys is not None:
+            for breakdown, key in zip((self.by_mode, self.by_criterion, self.by_type), keys):
+                if key not in breakdown:
+                    breakdown[key] = [0, 0, 0]
+                breakdown[key][0 if battle_res == 1 else 2 if battle_res == 2 else 1] += 1
+
+    def settled(self, tolerance: float) -> bool:
+        """ True once the 95% interval of the win rate is at most 2 * tolerance wide.
+            :complexity: Best/Worst O(1)
+        """
+        with self.lock:
+            won, played = self.won, self.played
+        low, high = wilson_interval(won, played)
+        return played > 0 and high - low <= 2 * tolerance
+
+    def snapshot(self) -> dict:
+        """ Returns the statistics so far.
+
+            :complexity: Best/Worst O(t+k), where t is the number of different turn counts and k is the number of keys
+                         in the breakdowns
+
+            The rates are given with their 95% Wilson interval as {"rate", "low", "high"}, and every breakdown maps a
+            key to its number of battles and win rate.
+        """
+        def rate(successes, trials):
+            low, high = wilson_interval(successes, trials)
+            return {"rate": successes / trials if trials else 0.0, "low": low, "high": high}
+
+        def breakdown(counts):
+            return {key: {"played": sum(counts[key]), "won": rate(counts[key][0], sum(counts[key]))}
+                    for key in counts}
+
+        with self.lock:
+            return {
+                "played": self.played,
+                "won": rate(self.won, self.played),
+                "drawn": rate(self.drawn, self.played),
+                "lost": rate(self.lost, self.played),
+                "streak": self.streak,
+                "longest_streak": self.longest_streak,
+                "longest_losing_streak": self.longest_losing_streak,
+                "mean_turns": self.total_turns / self.played if self.played else 0.0,
+                "turns": dict(sorted(self.turns.items())),
+                "by_mode": breakdown(self.by_mode),
+                "by_criterion": breakdown(self.by_criterion),
+                "by_type": breakdown(self.by_type),
+            }
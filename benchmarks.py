@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+"""
+Times seeded, repeatable scenarios of the battle engine, the teams, the data structures and the game screen, saves the
+timings as a JSON baseline and compares later runs against it.
+
+    python benchmarks.py --save baseline.json
+    python benchmarks.py --compare baseline.json --threshold 0.1
+"""
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import zlib
+from typing import Callable
+
+from array_sorted_list import ArraySortedList
+from battle import Battle
+from bset import BSet
+from linked_list import LinkedList
+from poke_team import PokeTeam, Criterion
+from print_screen import GameScreen
+from queue_adt import CircularQueue
+from random_gen import RandomGen
+from sorted_list import ListItem
+from tournament import Tournament
+from tower import BattleTower
+
+SEED = 123456789
+REPEAT = 5
+THRESHOLD = 0.1
+
+SCENARIOS = {}
+
+
+def scenario(name: str) -> Callable:
+    """ Registers a function as a benchmark scenario.
+
+        :param arg1: name of the scenario in the baseline
+        :complexity: Best/Worst O(1)
+
+        A scenario takes no arguments and returns a checksum of what it computed, so a run that is faster because it
+        does something different is caught as well.
+    """
+    def register(function: Callable[[], object]) -> Callable[[], object]:
+        SCENARIOS[name] = function
+        return function
+    return register
+
+
+def _checksum(values) -> int:
+    """ Returns a checksum of the repr of values that is the same in every process. """
+    return zlib.crc32(repr(values).encode("utf-8"))
+
+
+def _random_team(name: str) -> PokeTeam:
+    """ Returns a random team with a random battle mode and ai type, never user input.
+        :complexity: Best/Worst O(n), where n is the size of the team
+    """
+    battle_mode = RandomGen.randint(0, 2)
+    ai_mode = PokeTeam.AI(RandomGen.randint(1, len(PokeTeam.AI) - 1))
+    criterion = Criterion(RandomGen.randint(1, len(Criterion))) if battle_mode == 2 else None
+    return PokeTeam.random_team(name, battle_mode, ai_mode=ai_mode, criterion=criterion)
+
+
+def _bracket(teams: int) -> str:
+    """ Returns a balanced tournament string of teams teams, where teams is a power of 2. """
+    rounds = [f"T{idx}" for idx in range(teams)]
+    while len(rounds) > 1:
+        rounds = [f"{rounds[idx]} {rounds[idx + 1]} +" for idx in range(0, len(rounds), 2)]
+    return rounds[0]
+
+
+@scenario("battle_mixed")
+def battle_mixed() -> int:
+    """ 100 battles between teams of every battle mode and ai type. """
+    battle = Battle(verbosity=0)
+    results = [battle.battle(_random_team("A"), _random_team("B")) for _ in range(100)]
+    return _checksum(results)
+
+
+@scenario("battle_mode_pairs")
+def battle_mode_pairs() -> int:
+    """ 20 battles for every pair of battle modes, with swapping ai teams. """
+    battle = Battle(verbosity=0)
+    results = []
+    for mode1 in range(3):
+        for mode2 in range(3):
+            for _ in range(20):
+                team1 = PokeTeam.random_team("A", mode1, ai_mode=PokeTeam.AI.SWAP_ON_SUPER_EFFECTIVE,
+                                             criterion=Criterion.HP if mode1 == 2 else None)
+                team2 = PokeTeam.random_team("B", mode2, ai_mode=PokeTeam.AI.RANDOM,
+                                             criterion=Criterion.SPD if mode2 == 2 else None)
+                results.append(battle.battle(team1, team2))
+    return _checksum(results)
+
+
+@scenario("random_team")
+def random_team() -> int:
+    """ 1000 random teams. """
+    return _checksum([_random_team("A").get_config_code() for _ in range(1000)])
+
+
+@scenario("regenerate_team")
+def regenerate_team() -> int:
+    """ 1000 regenerations of a team of 6. """
+    team = PokeTeam.random_team("A", 2, team_size=6, criterion=Criterion.LV)
+    for _ in range(1000):
+        team.regenerate_team()
+    return _checksum(str(team))
+
+
+@scenario("array_sorted_list")
+def array_sorted_list() -> int:
+    """ 1000 adds with random keys, then deleting every item from the front. """
+    lst = ArraySortedList(1)
+    for idx in range(1000):
+        lst.add(ListItem(idx, RandomGen.randint(0, 10000)))
+    order = []
+    while not lst.is_empty():
+        order.append(lst.delete_at_index(0).value)
+    return _checksum(order[::25])
+
+
+@scenario("circular_queue")
+def circular_queue() -> int:
+    """ 20000 appends and serves through a queue of 100. """
+    queue = CircularQueue(100)
+    total = 0
+    for idx in range(20000):
+        if queue.is_full():
+            total += queue.serve()
+        queue.append(idx)
+    while not queue.is_empty():
+        total += queue.serve()
+    return total
+
+
+@scenario("linked_list")
+def linked_list() -> int:
+    """ 1000 inserts and deletes at random positions. """
+    lst = LinkedList()
+    for idx in range(1000):
+        lst.insert(RandomGen.randint(0, len(lst)), idx)
+    removed = []
+    while not lst.is_empty():
+        removed.append(lst.delete_at_index(RandomGen.randint(0, len(lst) - 1)))
+    return _checksum(removed)
+
+
+@scenario("bset")
+def bset() -> int:
+    """ 2000 rounds of adds, removes, unions, intersections and differences of small sets. """
+    total = 0
+    for _ in range(2000):
+        first = BSet()
+        second = BSet()
+        for _ in range(8):
+            first.add(RandomGen.randint(1, 64))
+            second.add(RandomGen.randint(1, 64))
+        item = RandomGen.randint(1, 64)
+        if item in first:
+            first.remove(item)
+        total += len(first.union(second)) + len(first.intersection(second)) + len(first.difference(second))
+    return total
+
+
+@scenario("tournament")
+def tournament() -> int:
+    """ A 32 team tournament in battle modes 0 and 1, the modes tournaments can be played in. """
+    games = []
+    for battle_mode in range(2):
+        tour = Tournament(Battle(verbosity=0))
+        tour.set_battle_mode(battle_mode)
+        tour.start_tournament(_bracket(32))
+        lst = tour.linked_list_of_games()
+        games.extend(lst[idx] for idx in range(len(lst)))
+    return _checksum(games)
+
+
+@scenario("battle_tower")
+def battle_tower() -> int:
+    """ A tower of 20 teams run to completion. """
+    tower = BattleTower(Battle(verbosity=0))
+    tower.set_my_team(PokeTeam.random_team("Player", 0, team_size=6))
+    tower.generate_teams(20)
+    results = [(res, them.get_team_name(), lives) for res, me, them, lives in tower]
+    return _checksum(results)
+
+
+@scenario("print_game_screen")
+def print_game_screen() -> int:
+    """ 300 frames of a battle drawn to a terminal-like stream, as print_game_screen does. """
+    stream = io.StringIO()
+    stream.isatty = lambda: True
+    screen = GameScreen(stream)
+    names = ["Charizard", "Venusaur", "Blastoise", "Gengar", "Eevee"]
+    statuses = ["free", "burn", "poison", "paralysis", "sleep", "confuse"]
+    for frame in range(300):
+        screen.draw(names[frame // 60], names[(frame // 45) % 5], 20 - frame % 20, 20, 15 - frame % 15, 15,
+                    frame // 60 + 1, frame // 45 + 1, statuses[frame % 6], statuses[frame // 50], 6 - frame // 60,
+                    6 - frame // 50)
+    return len(stream.getvalue())
+
+
+def run_benchmarks(names: list[str] | None = None, repeat: int = REPEAT, seed: int = SEED) -> dict[str, dict]:
+    """ Runs scenarios and times them.
+
+        :param arg1: names of the scenarios to run, every scenario if not given
+        :param arg2: number of timed runs of every scenario
+        :param arg3: seed of the random generator at the start of every run
+        :complexity: Best/Worst O(r*S), where r is repeat and S is the time of the scenarios
+        :raise ValueError: if a scenario is unknown
+
+        The function returns {"min", "median", "checksum"} of every scenario, with times in seconds, or {"skipped"}
+        with the reason when a file the scenario needs is missing, such as the sprites for print_game_screen. The
+        random generator is left as it was.
+    """
+    names = list(SCENARIOS) if names is None else names
+    for name in names:
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name}")
+    saved_seed = RandomGen.seed
+    results = {}
+    try:
+        for name in names:
+            times = []
+            checksums = set()
+            try:
+                for _ in range(repeat):
+                    RandomGen.set_seed(seed)
+                    start = time.perf_counter()
+                    checksums.add(SCENARIOS[name]())
+                    times.append(time.perf_counter() - start)
+            except FileNotFoundError as error:
+                results[name] = {"skipped": str(error)}
+                continue
+            if len(checksums) != 1:
+                raise ValueError(f"Scenario {name} is not repeatable")
+            results[name] = {"min": min(times), "median": statistics.median(times), "checksum": checksums.pop()}
+    finally:
+        RandomGen.seed = saved_seed
+    return results
+
+
+def save_baseline(results: dict[str, dict], path: str) -> None:
+    """ Saves the results of run_benchmarks as a JSON baseline, with the machine they were timed on. """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"python": platform.python_version(), "machine": platform.platform(), "scenarios": results}, file,
+                  indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> dict[str, dict]:
+    """ Returns the scenarios of a JSON baseline. """
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["scenarios"]
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict],
+            threshold: float = THRESHOLD) -> list[tuple[str, float, float, str]]:
+    """ Compares results against a baseline.
+
+        :param arg1: the results of run_benchmarks
+        :param arg2: the baseline, see load_baseline
+        :param arg3: largest allowed slowdown, as a fraction of the baseline time
+        :complexity: Best/Worst O(S), where S is the number of scenarios
+
+        The fastest runs are compared, since they are the least disturbed by the rest of the machine. The function
+        returns (name, baseline time, time, verdict) of every scenario timed in both, where the verdict is "ok",
+        "faster", "slower" when the slowdown is above threshold or "changed" when the checksum differs.
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline or "skipped" in result or "skipped" in baseline[name]:
+            continue
+        before = baseline[name]["min"]
+        after = result["min"]
+        if baseline[name]["checksum"] != result["checksum"]:
+            verdict = "changed"
+        elif after > before * (1 + threshold):
+            verdict = "slower"
+        elif after < before * (1 - threshold):
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        rows.append((name, before, after, verdict))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    """ Runs the benchmarks from the command line, returning 1 if a scenario got slower or changed. """
+    parser = argparse.ArgumentParser(description="Time the benchmark scenarios.")
+    parser.add_argument("scenarios", nargs="*", help="scenarios to run, all of them if none are given")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs of every scenario")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed at the start of every run")
+    parser.add_argument("--save", metavar="PATH", help="save the timings as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the timings against a baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="largest allowed slowdown, 0.1 is 10%%")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.scenarios or None, args.repeat, args.seed)
+    if args.save:
+        save_baseline(results, args.save)
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:>20} skipped: {result['skipped']}")
+    if not args.compare:
+        for name, result in results.items():
+            if "skipped" not in result:
+                print(f"{name:>20} {result['min'] * 1000:10.2f} ms {result['median'] * 1000:10.2f} ms")
+        return 0
+
+    rows = compare(results, load_baseline(args.compare), args.threshold)
+    for name, before, after, verdict in rows:
+        print(f"{name:>20} {before * 1000:10.2f} ms {after * 1000:10.2f} ms {after / before - 1:+8.1%} {verdict}")
+    return 1 if any(verdict in ("slower", "changed") for _, _, _, verdict in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+"""
+Compiles a postfix tournament string into an explicit match plan, so a bracket is parsed once and can be replayed
+without rescanning its tokens.
+"""
+
+import re
+from typing import Iterator, TextIO
+from referential_array import ArrayR
+from stack_adt import ArrayStack
+
+TOKEN_PATTERN = re.compile(r"\S+")
+CHUNK_SIZE = 1 << 16
+MAX_BALANCED_DEPTH = 64
+
+def iter_tokens(source: str | TextIO) -> Iterator[str]:
+    """ Lazily splits a tournament into its tokens.
+
+        :param arg1: a tournament string, or a text file containing one
+        :complexity: Best/Worst O(n), where n is the number of characters in the source
+
+        Tokens are separated by any whitespace. Files are read in chunks, so the whole tournament never has to be in
+        memory at once.
+    """
+    if isinstance(source, str):
+        for match in TOKEN_PATTERN.finditer(source):
+            yield match.group()
+        return
+
+    partial = ""
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        chunk = partial + chunk
+        partial = ""
+        for match in TOKEN_PATTERN.finditer(chunk):
+            if match.end() == len(chunk):
+                partial = match.group()
+            else:
+                yield match.group()
+    if partial:
+        yield partial
+
+def check_tournament(source: str | TextIO) -> tuple[bool, bool, int]:
+    """ Validates a tournament in a single pass without building any strings.
+
+        :param arg1: a tournament string, or a text file containing one
+        :complexity: Best O(k) when the k'th token is invalid, Worst O(n) when the tournament is valid, where n is the
+                     number of characters in the source
+
+        The function returns (is valid, is balanced, position of the first offending token). A tournament is valid
+        when every "+" has two brackets to combine and exactly one bracket is left at the end, and balanced when every
+        match combines two brackets with the same number of teams. The position is -1 for valid tournaments, and the
+        number of tokens when the tournament just ends too early.
+
+        Validation only counts the unfinished brackets. Balance keeps the team count of each unfinished bracket, but a
+        balanced tournament never has more than log2(teams) + 2 of those, so the check is dropped as soon as it fails.
+    """
+    depth = 0
+    balanced = True
+    sizes = []
+    position = 0
+    for token in iter_tokens(source):
+        if token != "+":
+            depth += 1
+            if balanced:
+                # two equal brackets on top must play each other before anything else joins
+                if len(sizes) >= 2 and sizes[-1] == sizes[-2] or len(sizes) >= MAX_BALANCED_DEPTH:
+                    balanced = False
+                else:
+                    sizes.append(1)
+        else:
+            if depth < 2:
+                return False, False, position
+            depth -= 1
+            if balanced:
+                size2 = sizes.pop()
+                size1 = sizes.pop()
+                if size1 != size2 or (sizes and sizes[-1] < size1 + size2):
+                    balanced = False
+                else:
+                    sizes.append(size1 + size2)
+        position += 1
+
+    if depth != 1:
+        return False, False, position
+    return True, balanced, -1
+
+class BracketPlan:
+    """ Array based tree of a single elimination bracket.
+
+        Nodes 0 to num_teams-1 are the teams in the order they appear in the tournament string, nodes num_teams
+        onwards are the matches in the order they are played (postfix order). Every match only depends on nodes with a
+        smaller index, so playing the matches in index order always has both participants ready.
+
+        Attributes:
+            tournament_str (str): the string the plan was compiled from
+            team_names (ArrayR[str]): name of every team node
+            team_nodes (dict[str, int]): node of every team name, the first one when a name is used twice
+            left (ArrayR[int]): left child of every node, -1 for teams
+            right (ArrayR[int]): right child of every node, -1 for teams
+            parent (ArrayR[int]): parent of every node, -1 for the final
+            max_depth (int): the most unfinished brackets that are waiting for an opponent at the same time
+    """
+
+    def __init__(self, tournament_str: str) -> None:
+        """ Compiles the tournament string.
+
+            :param arg1: a string represent the tournaments
+            :raises ValueError: if the tournament string is not valid
+            :complexity: Best/Worst O(n), where n is the number of characters in tournament_str
+        """
+        tokens = list(iter_tokens(tournament_str))
+        num_teams = 0
+        for token in tokens:
+            if token != "+":
+                num_teams += 1
+        num_matches = len(tokens) - num_teams
+        if num_teams == 0 or num_matches != num_teams - 1:
+            raise ValueError("Tournament is not valid")
+
+        self.tournament_str = tournament_str
+        self.num_teams = num_teams
+        self.num_matches = num_matches
+        self.team_names = ArrayR(num_teams)
+        self.team_nodes = {}
+        self.left = ArrayR(self.num_nodes())
+        self.right = ArrayR(self.num_nodes())
+        self.parent = ArrayR(self.num_nodes())
+        self.max_depth = 0
+
+        node_stack = ArrayStack(num_teams)
+        next_team = 0
+        next_match = num_teams
+        for token in tokens:
+            if token != "+":
+                self.team_names[next_team] = token
+                self.team_nodes.setdefault(token, next_team)
+                self.left[next_team] = -1
+                self.right[next_team] = -1
+                node_stack.push(next_team)
+                next_team += 1
+                self.max_depth = max(self.max_depth, len(node_stack))
+            else:
+                if len(node_stack) < 2:
+                    raise ValueError("Tournament is not valid")
+                self.right[next_match] = node_stack.pop()
+                self.left[next_match] = node_stack.pop()
+                self.parent[self.left[next_match]] = next_match
+                self.parent[self.right[next_match]] = next_match
+                node_stack.push(next_match)
+                next_match += 1
+
+        if len(node_stack) != 1:
+            raise ValueError("Tournament is not valid")
+        self.parent[node_stack.pop()] = -1
+
+    def num_nodes(self) -> int:
+        """ Returns the number of teams and matches in the bracket
+            :complexity: Best/Worst O(1)
+        """
+        return self.num_teams + self.num_matches
+
+    def is_team(self, node: int) -> bool:
+        """ True if the node is a team rather than a match
+            :complexity: Best/Worst O(1)
+        """
+        return node < self.num_teams
+
+    def match_node(self, match_idx: int) -> int:
+        """ Returns the node of the match_idx'th match to be played
+            :complexity: Best/Worst O(1)
+        """
+        return self.num_teams + match_idx
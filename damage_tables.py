@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+"""
+Builds expected damage and turns to knock out tables for every pair of species, over their levels and the status of
+the attacker, and keeps them on disk so they are only built again when the species change.
+"""
+
+import hashlib
+import inspect
+import os
+import numpy as np
+import pokemon
+import pokemon_base
+from pokemon_base import PokemonBase
+
+MAX_LEVEL = 10
+STATUSES = ["free", "burn", "poison", "paralysis", "sleep", "confuse"]
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".damage_cache")
+CACHE_VERSION = 1
+
+# chance that the attack reaches the defender and the factor on its damage, for every status, see PokemonBase.attack
+HIT_CHANCE = np.array([1, 1, 1, 1, 0, 0.5])
+DAMAGE_FACTOR = np.array([1, 0.5, 1, 1, 1, 1])
+
+
+def all_species() -> list[type]:
+    """ Returns every species in pokemon.py, in the order they are written.
+        :complexity: Best/Worst O(S), where S is the number of species
+    """
+    return [cls for cls in vars(pokemon).values() if inspect.isclass(cls) and issubclass(cls, PokemonBase)
+            and cls.__module__ == pokemon.__name__ and not inspect.isabstract(cls)]
+
+
+def species_hash(max_level: int = MAX_LEVEL) -> str:
+    """ Returns a hash of the species definitions and of the attack and defend rules they use.
+        :complexity: Best/Worst O(n), where n is the length of the source of pokemon.py and pokemon_base.py
+    """
+    digest = hashlib.sha256()
+    for module in (pokemon, pokemon_base):
+        digest.update(inspect.getsource(module).encode("utf-8"))
+    digest.update(f"{max_level}:{CACHE_VERSION}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _probe(cls: type, level: int) -> PokemonBase | None:
+    """ Returns a new pokemon of a species levelled up to level, None if the species starts above it.
+        :complexity: Best/Worst O(level)
+    """
+    probe = cls()
+    if probe.get_level() > level:
+        return None
+    while probe.get_level() < level:
+        probe.level_up()
+    return probe
+
+
+class DamageTables:
+    """ Damage tables of every attacker and defender species, level and attacker status.
+
+        Attributes:
+            names (np.ndarray): name of every species, shape (S,)
+            levels (np.ndarray): the levels of the tables, 1 to max_level, shape (L,)
+            valid (np.ndarray): True where a species can be at a level, shape (S, L)
+            max_hp (np.ndarray): max hp of every species and level, shape (S, L)
+            speed (np.ndarray): speed of every species, level and status, halved by paralysis, shape (S, L, T)
+            loss (np.ndarray): hp a defender loses to an attack of every integer damage, shape (S, L, D)
+            hit_damage (np.ndarray): integer damage of an attack that reaches the defender, shape (S, L, T, S)
+            expected_damage (np.ndarray): expected hp the defender loses per turn, shape (S, L, T, S, L)
+            turns_to_ko (np.ndarray): expected turns for the attacker to knock out a full hp defender, inf if it
+                                      never does, shape (S, L, T, S, L)
+
+        S is the number of species, L the number of levels, T the number of STATUSES and D one more than the largest
+        damage any attack does. The attacker comes first in every index and NaN marks a species below its starting
+        level. The defend rules are not written again here: loss is read from defend itself, by attacking a probe
+        pokemon with every damage, so a species like Charizard, which takes double damage above its defence, is
+        reproduced exactly. calculate_damage is probed the same way. A confused attacker hits the defender half the
+        time and a sleeping one never does, so turns_to_ko is the number of hits needed over the chance of a hit.
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray]) -> None:
+        """ Initialisation
+
+            :param arg1: the arrays of the tables, by attribute name
+            :complexity: Best/Worst O(1)
+        """
+        self.names = arrays["names"]
+        self.levels = arrays["levels"]
+        self.valid = arrays["valid"]
+        self.max_hp = arrays["max_hp"]
+        self.speed = arrays["speed"]
+        self.loss = arrays["loss"]
+        self.hit_damage = arrays["hit_damage"]
+        self.expected_damage = arrays["expected_damage"]
+        self.turns_to_ko = arrays["turns_to_ko"]
+
+    @classmethod
+    def build(cls, max_level: int = MAX_LEVEL) -> DamageTables:
+        """ Builds the tables from the species in pokemon.py.
+
+            :param arg1: highest level in the tables
+            :complexity: Best/Worst O(S^2*L^2*T + S*L*D), where S is the number of species, L is max_level, T is the
+                         number of statuses and D is the largest damage
+        """
+        species = all_species()
+        n_species = len(species)
+        levels = np.arange(1, max_level + 1)
+        probes = [[_probe(kind, int(level)) for level in levels] for kind in species]
+        valid = np.array([[probe is not None for probe in row] for row in probes])
+
+        max_hp = np.zeros((n_species, max_level))
+        speed = np.zeros((n_species, max_level))
+        raw_damage = np.zeros((n_species, max_level, n_species))
+        defenders = [kind() for kind in species]
+        for s_idx in range(n_species):
+            for l_idx in range(max_level):
+                probe = probes[s_idx][l_idx]
+                if probe is not None:
+                    max_hp[s_idx, l_idx] = probe.get_max_hp()
+                    speed[s_idx, l_idx] = probe.get_speed()
+                    for d_idx in range(n_species):
+                        raw_damage[s_idx, l_idx, d_idx] = probe.calculate_damage(defenders[d_idx])
+
+        # int() of PokemonBase.attack truncates, and every damage is positive
+        hit_damage = np.trunc(raw_damage[:, :, None, :] * DAMAGE_FACTOR[None, None, :, None]).astype(np.int64)
+        loss = np.zeros((n_species, max_level, int(hit_damage.max()) + 1), dtype=np.int64)
+        for s_idx in range(n_species):
+            for l_idx in range(max_level):
+                probe = probes[s_idx][l_idx]
+                if probe is not None:
+                    for damage in range(loss.shape[2]):
+                        before = probe.get_hp()
+                        probe.defend(damage)
+                        loss[s_idx, l_idx, damage] = before - probe.get_hp()
+                        probe.set_hp(before)
+
+        defender = np.arange(n_species)[None, None, None, :, None]
+        defender_level = np.arange(max_level)[None, None, None, None, :]
+        hit_loss = loss[defender, defender_level, hit_damage[..., None]]
+        hit_chance = HIT_CHANCE[None, None, :, None, None]
+        expected_damage = hit_loss * hit_chance
+        with np.errstate(divide="ignore", invalid="ignore"):
+            hits = np.ceil(max_hp[None, None, None, :, :] / hit_loss)
+            turns_to_ko = np.where((hit_loss > 0) & (hit_chance > 0), hits / hit_chance, np.inf)
+
+        both_valid = valid[:, :, None, None, None] & valid[None, None, None, :, :]
+        paralysed = np.array([status == "paralysis" for status in STATUSES])
+        status_speed = np.where(paralysed[None, None, :], speed[:, :, None] // 2, speed[:, :, None])
+        return cls({
+            "names": np.array([kind.__name__ for kind in species]),
+            "levels": levels,
+            "valid": valid,
+            "max_hp": np.where(valid, max_hp, np.nan),
+            "speed": np.where(valid[:, :, None], status_speed, np.nan),
+            "loss": loss,
+            "hit_damage": hit_damage,
+            "expected_damage": np.where(both_valid, expected_damage, np.nan),
+            "turns_to_ko": np.where(both_valid, turns_to_ko, np.nan),
+        })
+
+    @classmethod
+    def load(cls, cache_dir: str = CACHE_DIR, max_level: int = MAX_LEVEL) -> DamageTables:
+        """ Returns the tables from the disk cache, building and saving them if the species have changed.
+
+            :param arg1: directory of the cache
+            :param arg2: highest level in the tables
+            :complexity: Best O(n) when cached, where n is the size of the tables, Worst same as build
+        """
+        path = os.path.join(cache_dir, f"{species_hash(max_level)}.npz")
+        if os.path.exists(path):
+            with np.load(path) as cached:
+                return cls({name: cached[name] for name in cached.files})
+        tables = cls.build(max_level)
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = path + ".tmp.npz"
+        np.savez_compressed(temp_path, **tables.arrays())
+        os.replace(temp_path, path)
+        return tables
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """ Returns the arrays of the tables, by attribute name. """
+        return {name: getattr(self, name) for name in ("names", "levels", "valid", "max_hp", "speed", "loss",
+                                                       "hit_damage", "expected_damage", "turns_to_ko")}
+
+    def index(self, name: str, level: int) -> tuple[int, int]:
+        """ Returns the species and level indices of a species name and level.
+
+            :raise ValueError: if the species is unknown or the level is not in the tables
+            :complexity: Best/Worst O(S), where S is the number of species
+        """
+        matches = np.flatnonzero(self.names == name)
+        if len(matches) == 0:
+            raise ValueError(f"Unknown species {name}")
+        if not 1 <= level <= len(self.levels):
+            raise ValueError(f"Level {level} is not in the tables")
+        return int(matches[0]), level - 1
+
+    def expected(self, attacker: str, attacker_level: int, status: str, defender: str, defender_level: int) -> float:
+        """ Returns the expected hp a defender loses per turn to an attacker.
+            :complexity: Best/Worst O(S), see index
+        """
+        a_idx, a_level = self.index(attacker, attacker_level)
+        d_idx, d_level = self.index(defender, defender_level)
+        return float(self.expected_damage[a_idx, a_level, STATUSES.index(status), d_idx, d_level])
+
+    def turns(self, attacker: str, attacker_level: int, status: str, defender: str, defender_level: int) -> float:
+        """ Returns the expected turns an attacker takes to knock out a full hp defender.
+            :complexity: Best/Worst O(S), see index
+        """
+        a_idx, a_level = self.index(attacker, attacker_level)
+        d_idx, d_level = self.index(defender, defender_level)
+        return float(self.turns_to_ko[a_idx, a_level, STATUSES.index(status), d_idx, d_level])
+
+    def first_strike(self) -> np.ndarray:
+        """ Returns 1 where the attacker moves before the defender, -1 where it moves after and 0 on a speed tie,
+            over (attacker species, level, status, defender species, level, status). NaN speeds compare as a tie.
+            :complexity: Best/Worst O((S*L*T)^2)
+        """
+        attacker = self.speed[:, :, :, None, None, None]
+        defender = self.speed[None, None, None, :, :, :]
+        return np.sign(np.nan_to_num(attacker - defender)).astype(np.int8)
+
+
+if __name__ == "__main__":
+    tables = DamageTables.load()
+    for a_idx, attacker in enumerate(tables.names):
+        row = [f"{tables.turns_to_ko[a_idx, 2, 0, d_idx, 2]:>5.1f}" for d_idx in range(len(tables.names))]
+        print(f"{attacker:>12}", *row)
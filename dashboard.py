@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+"""
+Shows many battles at once in one terminal, as a grid of small panels refreshed at a fixed rate.
+"""
+
+import multiprocessing
+import queue
+import shutil
+import threading
+import time
+from print_screen import GameScreen, STATUS_MAPPING, POKEMON_COLORS, CLEAR, HEALTH_HIGH, HEALTH_MED, HEALTH_LOW
+
+PANEL_WIDTH = 36
+PANEL_HEIGHT = 6
+BAR_WIDTH = 20
+MAX_PIPS = 6
+
+
+class BattleBoard:
+    """ Shared table of the latest turn of every battle being watched.
+
+        Attributes:
+            labels (dict[int, str]): label of every battle, such as the names of the two teams
+            snapshots (dict[int, tuple]): latest snapshot of every battle, in the format of print_game_screen arguments
+            results (dict[int, int]): result of every battle that has finished
+
+        Battles can update the table from any thread, through a BoardSlot given to Battle as its renderer. Battles in
+        other processes update it through the BoardChannel returned by channel, whose messages are applied every time
+        the board is copied.
+    """
+
+    def __init__(self) -> None:
+        """ Initialisation
+
+            :complexity: Best/Worst O(1)
+        """
+        self.labels = {}
+        self.snapshots = {}
+        self.results = {}
+        self.lock = threading.Lock()
+        self._manager = None
+        self._channel = None
+
+    def channel(self) -> BoardChannel:
+        """ Returns a handle to the board that can be sent to worker processes, such as those of a process pool.
+
+            :complexity: Best/Worst O(1), the first call starts the manager process that carries the messages
+        """
+        with self.lock:
+            if self._channel is None:
+                self._manager = multiprocessing.Manager()
+                self._channel = BoardChannel(self._manager.Queue())
+            return self._channel
+
+    def close(self) -> None:
+        """ Applies the last messages of the channel and stops its manager process, if channel was ever called. """
+        self.drain()
+        with self.lock:
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+                self._channel = None
+
+    def drain(self) -> None:
+        """ Applies every message sent through the channel so far.
+            :complexity: Best/Worst O(m), where m is the number of messages waiting
+        """
+        channel = self._channel
+        if channel is None:
+            return
+        while True:
+            try:
+                name, args = channel.messages.get_nowait()
+            except queue.Empty:
+                return
+            getattr(self, name)(*args)
+
+    def slot(self, battle_id: int, label: str) -> BoardSlot:
+        """ Adds a battle to the board and returns the renderer it should update.
+
+            :param arg1: key of the battle, panels are shown in order of key
+            :param arg2: label shown at the top of its panel
+            :complexity: Best/Worst O(1)
+        """
+        with self.lock:
+            self.labels[battle_id] = label
+            self.results.pop(battle_id, None)
+        return BoardSlot(self, battle_id)
+
+    def update(self, battle_id: int, snapshot: tuple) -> None:
+        """ Stores the latest turn of a battle, unless it was taken off the board.
+            :complexity: Best/Worst O(1)
+        """
+        with self.lock:
+            if battle_id in self.labels:
+                self.snapshots[battle_id] = snapshot
+
+    def finish(self, battle_id: int, battle_res: int) -> None:
+        """ Stores the result of a battle, its panel stays on the board until it is removed.
+            :complexity: Best/Worst O(1)
+        """
+        with self.lock:
+            if battle_id in self.labels:
+                self.results[battle_id] = battle_res
+
+    def remove(self, battle_id: int) -> None:
+        """ Takes a battle off the board.
+            :complexity: Best/Worst O(1)
+        """
+        with self.lock:
+            self.labels.pop(battle_id, None)
+            self.snapshots.pop(battle_id, None)
+            self.results.pop(battle_id, None)
+
+    def copy(self) -> list[tuple[str, tuple | None, int | None]]:
+        """ Returns (label, latest snapshot, result) of every battle, in order of key, after draining the channel.
+            :complexity: Best/Worst O(m + n log n), where m is the number of messages waiting and n is the number of
+                         battles on the board
+        """
+        self.drain()
+        with self.lock:
+            return [(self.labels[battle_id], self.snapshots.get(battle_id), self.results.get(battle_id))
+                    for battle_id in sorted(self.labels)]
+
+
+class BoardChannel:
+    """ Picklable handle to a BattleBoard, with the same slot, update, finish and remove methods.
+
+        Attributes:
+            messages: queue of a multiprocessing manager, holding (method name, arguments) for the board to apply
+
+        Every call is sent to the manager process right away, so it reaches the board even if the worker that made it
+        exits. The order of the calls of one process is kept.
+    """
+
+    def __init__(self, messages) -> None:
+        self.messages = messages
+
+    def slot(self, battle_id: int, label: str) -> BoardSlot:
+        """ Adds a battle to the board and returns the renderer it should update.
+            :complexity: Best/Worst O(1)
+        """
+        self.messages.put(("slot", (battle_id, label)))
+        return BoardSlot(self, battle_id)
+
+    def update(self, battle_id: int, snapshot: tuple) -> None:
+        """ Stores the latest turn of a battle.
+            :complexity: Best/Worst O(1)
+        """
+        self.messages.put(("update", (battle_id, snapshot)))
+
+    def finish(self, battle_id: int, battle_res: int) -> None:
+        """ Stores the result of a battle.
+            :complexity: Best/Worst O(1)
+        """
+        self.messages.put(("finish", (battle_id, battle_res)))
+
+    def remove(self, battle_id: int) -> None:
+        """ Takes a battle off the board.
+            :complexity: Best/Worst O(1)
+        """
+        self.messages.put(("remove", (battle_id,)))
+
+
+class BoardSlot:
+    """ Renderer for Battle that writes every turn of one battle to a BattleBoard or BoardChannel, see RenderThread. """
+
+    def __init__(self, board: BattleBoard | BoardChannel, battle_id: int) -> None:
+        self.board = board
+        self.battle_id = battle_id
+
+    def submit(self, snapshot: tuple) -> None:
+        """ Stores a turn of the battle.
+            :complexity: Best/Worst O(1)
+        """
+        self.board.update(self.battle_id, snapshot)
+
+    def finish(self, battle_res: int) -> None:
+        """ Stores the result of the battle.
+            :complexity: Best/Worst O(1)
+        """
+        self.board.finish(self.battle_id, battle_res)
+
+
+class Dashboard:
+    """ Draws a BattleBoard as a grid of panels at a fixed rate, on its own thread.
+
+        Attributes:
+            board (BattleBoard): the battles to show
+            columns (int | None): panels per row, as many as fit the terminal if None
+            fps (float): refreshes per second
+            screen (GameScreen): the screen the grid is drawn on, so only changed cells are written
+
+        A refresh only reads a copy of the board, so battles are never slowed down by the drawing, however many there
+        are.
+    """
+
+    def __init__(self, board: BattleBoard, columns: int | None = None, fps: float = 4,
+                 screen: GameScreen | None = None) -> None:
+        """ Initialisation
+
+            :complexity: Best/Worst O(1)
+        """
+        self.board = board
+        self.columns = columns
+        self.fps = fps
+        self.screen = GameScreen() if screen is None else screen
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> Dashboard:
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """ Starts refreshing the dashboard. """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="Dashboard", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """ Stops refreshing, after drawing the board one last time. """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        """ Draws the board once.
+            :complexity: Best/Worst O(n), where n is the number of battles on the board
+        """
+        self.screen.show(self.compose())
+
+    def compose(self) -> list[list[str]]:
+        """ Returns the raw cells of the grid of panels, in the same format as compose_game_screen.
+            :complexity: Best/Worst O(n), where n is the number of battles on the board
+        """
+        columns = self.columns
+        if columns is None:
+            columns = max(1, shutil.get_terminal_size().columns // (PANEL_WIDTH + 1))
+        battles = self.board.copy()
+        window = []
+        for first in range(0, len(battles), columns):
+            panels = [compose_panel(*battle) for battle in battles[first:first + columns]]
+            for line in range(PANEL_HEIGHT):
+                row = []
+                for panel in panels:
+                    row.extend(panel[line])
+                    row.append(" ")
+                row.extend(" " * ((PANEL_WIDTH + 1) * (columns - len(panels))))
+                window.append(row)
+        return window
+
+    def _run(self) -> None:
+        """ Refreshes the board every 1 / fps seconds until closed. """
+        next_refresh = time.monotonic()
+        while not self._stop.wait(max(0.0, next_refresh - time.monotonic())):
+            self.refresh()
+            next_refresh = max(next_refresh + 1 / self.fps, time.monotonic())
+
+
+def compose_panel(label: str, snapshot: tuple | None, battle_res: int | None) -> list[list[str]]:
+    """ Returns the raw cells of the panel of one battle.
+
+        :param arg1: label of the battle
+        :param arg2: latest snapshot of the battle, in the format of print_game_screen arguments
+        :param arg3: result of the battle if it has finished
+        :complexity: Best/Worst O(1), a panel has a fixed size
+
+        The panel shows the label, then the name, level, status, remaining pokemon and hp bar of the current pokemon of
+        both teams.
+    """
+    title = label if battle_res is None else f"{label} - " + ("draw" if battle_res == 0 else f"team {battle_res} won")
+    panel = [_text_cells(title[:PANEL_WIDTH].ljust(PANEL_WIDTH))]
+    if snapshot is None:
+        for _ in range(PANEL_HEIGHT - 2):
+            panel.append(_text_cells(" " * PANEL_WIDTH))
+    else:
+        (name1, name2, cur_hp1, max_hp1, cur_hp2, max_hp2, lvl1, lvl2, status1, status2,
+         remaining1, remaining2) = snapshot
+        panel.append(_pokemon_line(name1, lvl1, status1, remaining1))
+        panel.append(_hp_line(cur_hp1, max_hp1))
+        panel.append(_pokemon_line(name2, lvl2, status2, remaining2))
+        panel.append(_hp_line(cur_hp2, max_hp2))
+    panel.append(_text_cells("-" * PANEL_WIDTH))
+    return panel
+
+
+def _text_cells(text: str, color: str = "") -> list[str]:
+    """ Returns one cell per character, with the colour codes around the whole text. """
+    cells = list(text)
+    if color and cells:
+        cells[0] = color + cells[0]
+        cells[-1] = cells[-1] + CLEAR
+    return cells
+
+
+def _pokemon_line(name: str, lvl: int, status: str, remaining: int) -> list[str]:
+    """ Returns the cells of the name, level, status and remaining pokemon of a pokemon, PANEL_WIDTH wide. """
+    cells = _text_cells(name.upper()[:11].ljust(11), POKEMON_COLORS.get(name.lower(), ""))
+    cells.extend(_text_cells(" LV" + str(lvl).zfill(2) + " "))
+    cells.extend(STATUS_MAPPING.get(status, STATUS_MAPPING["free"]))
+    cells.extend(_text_cells("  "))
+    for x in range(MAX_PIPS):
+        cells.extend(_text_cells(("█" if x < remaining else "*") + " "))
+    cells.extend(_text_cells(" " * (PANEL_WIDTH - 22 - 2 * MAX_PIPS)))
+    return cells
+
+
+def _hp_line(cur_hp: int, max_hp: int) -> list[str]:
+    """ Returns the cells of the hp bar and hp of a pokemon, PANEL_WIDTH wide. """
+    hp_ratio = cur_hp / max_hp if max_hp > 0 else 0
+    covered = int(BAR_WIDTH * hp_ratio)
+    if hp_ratio > 0.66:
+        color = HEALTH_HIGH
+    elif hp_ratio > 0.33:
+        color = HEALTH_MED
+    else:
+        color = HEALTH_LOW
+    cells = _text_cells(" |")
+    cells.extend(_text_cells("█" * covered, color))
+    cells.extend(_text_cells("-" * (BAR_WIDTH - covered) + "| "))
+    cells.extend(_text_cells((str(cur_hp).zfill(2) + "/" + str(max_hp).zfill(2)).ljust(PANEL_WIDTH - BAR_WIDTH - 4)))
+    return cells
+
+
+if __name__ == "__main__":
+    from league import RoundRobinLeague
+    from random_gen import RandomGen
+
+    RandomGen.set_seed(1234)
+    league = RoundRobinLeague()
+    league.generate_teams(16)
+    board = BattleBoard()
+    with Dashboard(board, fps=10):
+        standings = league.run(seed=1234, board=board)
+    board.close()
+    for row in standings[:4]:
+        print(*row)
@@ -2,11 +2,24 @@
 Run leaderboard matches against the leaderboard team.
 """
 
+from __future__ import annotations
+
 from battle import Battle
+from battle_stats import BattleStats
+from result_store import ResultStore
 from poke_team import PokeTeam, Criterion
 from random_gen import RandomGen
 
-def leaderboard():    
+def leaderboard(stats: BattleStats | None = None, tolerance: float | None = None, store: ResultStore | None = None):
+    """ Plays the leaderboard team against 1000 random teams.
+
+        :param arg1: a BattleStats every result is added to as soon as it is known, so it can be read during the run
+        :param arg2: stop early once the 95% interval of the win rate in stats is at most 2 * tolerance wide
+        :param arg3: a ResultStore every battle is added to, with the seed it started from
+        :raises ValueError: if a tolerance is given without stats to check it against
+    """
+    if tolerance is not None and stats is None:
+        raise ValueError("Stopping early at a tolerance needs a BattleStats to track the win rate")
     RandomGen.set_seed((1<<16) + 1029348)
 
     leaderboard_team = PokeTeam.leaderboard_team()
@@ -22,8 +35,12 @@ def leaderboard():
     draw = 0
     loss = 0
     b = Battle()
+    leaderboard_code = leaderboard_team.get_config_code()
     for team in teams:
+        seed = RandomGen.seed
         res = b.battle(leaderboard_team, team)
+        if store is not None:
+            store.add(leaderboard_code, team.get_config_code(), res, seed, b.turn_count, "leaderboard")
         if res == 0:
             draw += 1
         elif res == 1:
@@ -35,6 +52,10 @@ def leaderboard():
             streak = 0
         played += 1
         leaderboard_team.regenerate_team()
+        if stats is not None:
+            stats.add(res, b.turn_count, team.get_config_code())
+            if tolerance is not None and stats.settled(tolerance):
+                break
 
     return [
         {"name": "Percentage Won", "value": f"{100*won/played:.2f}%"},
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+"""
+Round robin and swiss tournaments, where every team plays many matches and is ranked by the points it collects.
+Matches of a round are independent, so they are played across a process pool.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator
+from battle import battle_codes
+from dashboard import BattleBoard
+from poke_team import PokeTeam
+from random_gen import RandomGen
+
+WIN_POINTS = 2
+DRAW_POINTS = 1
+
+
+def _battle_chunk(chunk: list[tuple[int, int, int, int, int]], board=None) -> list[tuple[int, int, int]]:
+    """ Plays a chunk of pairings in a worker process.
+
+        :param arg1: list of (team1 index, team2 index, team1 code, team2 code, seed)
+        :param arg2: a BattleBoard, or the BoardChannel of one, to show the battles on, see battle_codes
+        :complexity: Best/Worst O(k*B), where k is len(chunk) and B is the time complexity of running a battle.
+    """
+    return [(team1, team2, battle_codes(code1, code2, seed, board)) for team1, team2, code1, code2, seed in chunk]
+
+
+class PairingScheduler:
+    """ Plays pairings of teams across a process pool, with a seed derived for every match.
+
+        Attributes:
+            seed (int): base seed that every match seed is derived from
+            max_workers (int | None): number of worker processes, 1 plays every match in this process
+            chunk_size (int): number of matches sent to a worker at once
+            board (BattleBoard | None): board that shows the match every worker is playing
+    """
+
+    def __init__(self, seed: int, max_workers: int | None = None, chunk_size: int = 64,
+                 board: BattleBoard | None = None) -> None:
+        """ Initialisation
+
+            :complexity: Best/Worst O(1)
+        """
+        self.seed = seed
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.board = board
+        self.pool = None
+
+    def __enter__(self) -> PairingScheduler:
+        """ Starts the process pool, which is then reused for every round. """
+        if self.max_workers != 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self
+
+    def __exit__(self, *args) -> None:
+        """ Shuts the process pool down. """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def play(self, round_idx: int, pairings: Iterable[tuple[int, int]], team_codes: array) -> Iterator[tuple[int, int, int]]:
+        """ Plays a round of pairings.
+
+            :param arg1: index of the round, used to derive the match seeds
+            :param arg2: pairs of team indices
+            :param arg3: configuration code of every team
+            :complexity: Best/Worst O(k*B), where k is the number of pairings and B is the time complexity of running
+                         a battle, spread over the workers.
+
+            The function yields (team1 index, team2 index, battle result) as soon as each chunk of matches is done.
+            Match i of the round always uses RandomGen.derive_seed(seed, round_idx, i), so the results do not depend
+            on the number of workers or the order they finish in. Only a few chunks per worker are in flight at once,
+            so pairings can be generated lazily for very large rounds.
+        """
+        chunks = self._chunks(round_idx, pairings, team_codes)
+        if self.pool is None:
+            saved_seed = RandomGen.seed
+            for chunk in chunks:
+                for result in _battle_chunk(chunk, self.board):
+                    yield result
+            RandomGen.seed = saved_seed
+            return
+
+        max_in_flight = 4 * (self.max_workers or os.cpu_count() or 1)
+        channel = None if self.board is None else self.board.channel()
+        running = set()
+        for chunk in chunks:
+            running.add(self.pool.submit(_battle_chunk, chunk, channel))
+            if len(running) >= max_in_flight:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for result in future.result():
+                        yield result
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    yield result
+
+    def _chunks(self, round_idx: int, pairings: Iterable[tuple[int, int]], team_codes: array) -> Iterator[list]:
+        """ Groups the pairings of a round into chunks, attaching codes and seeds.
+            :complexity: Best/Worst O(k), where k is the number of pairings
+        """
+        chunk = []
+        pair_idx = 0
+        for team1, team2 in pairings:
+            chunk.append((team1, team2, team_codes[team1], team_codes[team2],
+                          RandomGen.derive_seed(self.seed, round_idx, pair_idx)))
+            pair_idx += 1
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class League(ABC):
+    """ Teams stored as configuration codes, with standings that are updated as results arrive.
+
+        Attributes:
+            team_names (list[str]): name of every team
+            team_codes (array): configuration code of every team
+            points (array): points of every team, WIN_POINTS for a win and DRAW_POINTS for a draw
+            wins, draws, losses (array): record of every team
+    """
+
+    def __init__(self) -> None:
+        """ Initialisation
+
+            :complexity: Best/Worst O(1)
+        """
+        self.team_names = []
+        self.team_codes = array("I")
+        self.points = array("i")
+        self.wins = array("i")
+        self.draws = array("i")
+        self.losses = array("i")
+
+    def __len__(self) -> int:
+        """ Returns the number of teams. """
+        return len(self.team_codes)
+
+    def add_team(self, team_name: str, team_code: int) -> None:
+        """ To add a team to the league.
+
+            :param arg1: name of the team
+            :param arg2: configuration code of the team, see PokeTeam.encode_config
+            :complexity: Best/Worst O(1) amortised
+        """
+        self.team_names.append(team_name)
+        self.team_codes.append(team_code)
+        for record in (self.points, self.wins, self.draws, self.losses):
+            record.append(0)
+
+    def generate_teams(self, n: int, battle_mode: int | None = None) -> None:
+        """ To add random teams to the league.
+
+            :param arg1: number of teams to generate
+            :param arg2: battle mode of the teams, random between 0 and 1 if not given
+            :complexity: Best/Worst O(n), only the configuration codes are drawn, see PokeTeam.random_config
+        """
+        for _ in range(n):
+            mode = RandomGen.randint(0, 1) if battle_mode is None else battle_mode
+            self.add_team(f"Team {len(self)}", PokeTeam.random_config(mode))
+
+    def record_result(self, team1: int, team2: int, battle_res: int) -> None:
+        """ To update the standings with one result.
+
+            :param arg1: index of the first team
+            :param arg2: index of the second team
+            :param arg3: the result of the battle
+            :complexity: Best/Worst O(1)
+        """
+        if battle_res == 1:
+            self.points[team1] += WIN_POINTS
+            self.wins[team1] += 1
+            self.losses[team2] += 1
+        elif battle_res == 2:
+            self.points[team2] += WIN_POINTS
+            self.wins[team2] += 1
+            self.losses[team1] += 1
+        else:
+            self.points[team1] += DRAW_POINTS
+            self.points[team2] += DRAW_POINTS
+            self.draws[team1] += 1
+            self.draws[team2] += 1
+
+    def standings(self, top: int | None = None) -> list[tuple[str, int, int, int, int]]:
+        """ To rank the teams.
+
+            :param arg1: number of teams to return, all of them if not given
+            :complexity: Best/Worst O(n log n), where n is the number of teams
+
+            The function returns (name, points, wins, draws, losses) of the teams, best first. Ties keep the order the
+            teams were added in.
+        """
+        order = self._ranking()
+        if top is not None:
+            order = order[:top]
+        return [(self.team_names[idx], self.points[idx], self.wins[idx], self.draws[idx], self.losses[idx])
+                for idx in order]
+
+    def run(self, seed: int, max_workers: int | None = None,
+            board: BattleBoard | None = None) -> list[tuple[str, int, int, int, int]]:
+        """ To play every round of the league.
+
+            :param arg1: base seed that every match seed is derived from
+            :param arg2: number of worker processes, 1 plays every match in this process
+            :param arg3: a BattleBoard to show the match every worker is playing on
+            :complexity: Best/Worst O(M*B), where M is the number of matches and B is the time complexity of running a
+                         battle, spread over the workers.
+
+            The function returns the final standings.
+        """
+        with PairingScheduler(seed, max_workers, board=board) as scheduler:
+            for round_idx in range(self.num_rounds()):
+                for team1, team2, battle_res in scheduler.play(round_idx, self.pairings(round_idx), self.team_codes):
+                    self.record_result(team1, team2, battle_res)
+        return self.standings()
+
+    def _ranking(self) -> list[int]:
+        """ Returns the team indices ordered by points, best first.
+            :complexity: Best/Worst O(n log n), where n is the number of teams
+        """
+        return sorted(range(len(self)), key=lambda idx: -self.points[idx])
+
+    @abstractmethod
+    def num_rounds(self) -> int:
+        """ Returns the number of rounds to play. """
+        pass
+
+    @abstractmethod
+    def pairings(self, round_idx: int) -> Iterable[tuple[int, int]]:
+        """ Returns the pairs of team indices that play in a round. """
+        pass
+
+
+class RoundRobinLeague(League):
+    """ Every team plays every other team once. """
+
+    def num_rounds(self) -> int:
+        """ Returns the number of rounds to play.
+            :complexity: Best/Worst O(1)
+        """
+        return len(self) - 1 if len(self) % 2 == 0 else len(self)
+
+    def pairings(self, round_idx: int) -> Iterator[tuple[int, int]]:
+        """ Yields the pairs of a round, using the circle method.
+
+            :param arg1: index of the round
+            :complexity: Best/Worst O(n), where n is the number of teams
+
+            The first team stays in place while the others rotate by one every round, so after all rounds every pair
+            has met exactly once. With an odd number of teams the team paired with the empty seat sits the round out.
+        """
+        n = len(self) + len(self) % 2
+        rotating = n - 1
+        for pos in range(n // 2):
+            if pos == 0:
+                team1 = 0
+            else:
+                team1 = (round_idx + pos - 1) % rotating + 1
+            team2 = (round_idx + rotating - pos - 1) % rotating + 1
+            if team1 < len(self) and team2 < len(self):
+                yield team1, team2
+
+
+class SwissLeague(League):
+    """ Teams with similar scores play each other, for a fixed number of rounds.
+
+        Attributes:
+            rounds (int): number of rounds to play
+            opponents (set[tuple[int, int]]): pairs that already played, so they are not paired again
+            had_bye (array): 1 for teams that already sat out a round
+    """
+
+    def __init__(self, rounds: int | None = None) -> None:
+        """ Initialisation
+
+            :param arg1: number of rounds, enough to find a single unbeaten team if not given
+            :complexity: Best/Worst O(1)
+        """
+        League.__init__(self)
+        self.rounds = rounds
+        self.opponents = set()
+        self.had_bye = array("b")
+
+    def add_team(self, team_name: str, team_code: int) -> None:
+        """ To add a team to the league.
+            :complexity: Best/Worst O(1) amortised
+        """
+        League.add_team(self, team_name, team_code)
+        self.had_bye.append(0)
+
+    def num_rounds(self) -> int:
+        """ Returns the number of rounds to play.
+            :complexity: Best/Worst O(log n), where n is the number of teams
+        """
+        if self.rounds is not None:
+            return self.rounds
+        return max(1, (len(self) - 1).bit_length())
+
+    def pairings(self, round_idx: int) -> list[tuple[int, int]]:
+        """ Returns the pairs of a round.
+
+            :param arg1: index of the round
+            :complexity: Best O(n log n) when every team can play the next one in the standings, Worst O(n^2) when
+                         teams have to look far down the standings for an opponent they have not played.
+
+            The lowest ranked team that has not sat out yet gets a bye with the points of a win when the number of
+            teams is odd. Every other team, best first, plays the next unpaired team it has not played before, or the
+            next unpaired team if it has played them all.
+        """
+        order = self._ranking()
+        if len(order) % 2 == 1:
+            for pos in range(len(order) - 1, -1, -1):
+                if not self.had_bye[order[pos]] or pos == 0:
+                    bye = order.pop(pos)
+                    self.had_bye[bye] = 1
+                    self.points[bye] += WIN_POINTS
+                    break
+
+        paired = [False] * len(order)
+        pairs = []
+        for pos in range(len(order)):
+            if paired[pos]:
+                continue
+            opponent = -1
+            for other in range(pos + 1, len(order)):
+                if not paired[other]:
+                    if opponent == -1:
+                        opponent = other
+                    if self._pair_key(order[pos], order[other]) not in self.opponents:
+                        opponent = other
+                        break
+            paired[pos] = True
+            paired[opponent] = True
+            self.opponents.add(self._pair_key(order[pos], order[opponent]))
+            pairs.append((order[pos], order[opponent]))
+        return pairs
+
+    def _pair_key(self, team1: int, team2: int) -> tuple[int, int]:
+        """ Returns the same key for a pair whichever team is given first.
+            :complexity: Best/Worst O(1)
+        """
+        return (team1, team2) if team1 < team2 else (team2, team1)
+
+
+if __name__ == "__main__":
+    RandomGen.set_seed(1234)
+    league = SwissLeague()
+    league.generate_teams(64)
+    for row in league.run(seed=1234)[:8]:
+        print(row)
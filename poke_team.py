@@ -40,6 +40,10 @@ class PokeTeam:
     POKEDEX = ["Charmander", "Charizard", "Bulbasaur", "Venusaur", "Squirtle", "Blastoise", "Gastly", "Haunter",
                "Gengar", "Eevee"]
 
+    # configuration code of the leaderboard team, team_optimizer.best_leaderboard_config() with its default seeds, which
+    # python team_optimizer.py prints again. The search never plays the opponents of leaderboard()
+    LEADERBOARD_CONFIG = 180233
+
     class AI(Enum):
         """
         Used to select the proper Pokemon AI variable and keep the listings together. The number of enum members 
@@ -140,6 +144,48 @@ class PokeTeam:
         If no team size is specified, a random one between 3 and 6 is chosen
         If no ai_mode is specified, it is set to Random as default
         """
+        team_numbers = cls._random_team_numbers(team_size)
+
+        if ai_mode is None:
+            ai_mode = PokeTeam.AI.RANDOM
+
+        poke_team = PokeTeam(team_name, team_numbers, battle_mode, ai_mode, **kwargs)
+
+        return poke_team
+
+    @classmethod
+    def random_config(cls, battle_mode: int, team_size=None, ai_mode=None, criterion=None) -> int:
+        """ Draws the configuration code of a random PokeTeam without creating it
+
+        :param args1: an integer representing the battle mode
+        :param args2: an integer representing the team size
+        :param args3: ai type of the PokeTeam
+        :param args4: criterion of the PokeTeam
+        :complexity: best/worst O(1)
+
+        This function uses the same random numbers as random_team with the same arguments, so
+        PokeTeam.from_config_code(team_name, code) gives the team random_team would have created.
+
+        :raises ValueError: if battle mode is invalid, or is 2 without a criterion to order the team by
+        """
+        if not isinstance(battle_mode, int) or battle_mode not in [0, 1, 2]:
+            raise ValueError("Battle mode must be between 0 to 2 (inclusive)")
+        if battle_mode == 2 and criterion is None:
+            raise ValueError("Battle mode 2 needs a criterion")
+        team_numbers = cls._random_team_numbers(team_size)
+        if ai_mode is None:
+            ai_mode = PokeTeam.AI.RANDOM
+        return cls.encode_config(team_numbers, battle_mode, ai_mode, criterion)
+
+    @staticmethod
+    def _random_team_numbers(team_size=None) -> list[int]:
+        """ Draws how many pokemon of each kind a random team has
+
+        :param args: an integer representing the team size
+        :complexity: best/worst O(1)
+
+        If no team size is specified, a random one between 3 and 6 is chosen
+        """
         if team_size is None:
             team_size = RandomGen.randint(3, 6)
 
@@ -153,13 +199,77 @@ class PokeTeam:
         for idx in range(len(team_size_lst)-1):
             diff = team_size_lst[idx+1].key - team_size_lst[idx].key
             team_numbers.append(diff)
+        return team_numbers
 
-        if ai_mode is None:
-            ai_mode = PokeTeam.AI.RANDOM
+    @staticmethod
+    def encode_config(team_numbers: list[int], battle_mode: int, ai_type: PokeTeam.AI, criterion=None) -> int:
+        """ Packs a team configuration into a single integer
 
-        poke_team = PokeTeam(team_name, team_numbers, battle_mode, ai_mode, **kwargs)
+        :param args1: a list of integers to indicate the team's respective numbers of each pokemon
+        :param args2: an integer representing the battle mode
+        :param args3: ai type of the PokeTeam
+        :param args4: criterion of the PokeTeam
+        :complexity: best/worst O(1)
 
-        return poke_team
+        Each team number takes 3 bits, followed by 2 bits for the battle mode, 2 bits for the ai type and 3 bits
+        for the criterion (0 if there is none). Two teams with the same code always battle the same way.
+        """
+        code = 0
+        for idx in range(len(team_numbers)):
+            code |= team_numbers[idx] << (3 * idx)
+        code |= battle_mode << 15
+        code |= (ai_type.value - 1) << 17
+        if criterion is not None:
+            code |= criterion.value << 19
+        return code
+
+    @staticmethod
+    def decode_config(code: int) -> tuple[list[int], int, PokeTeam.AI, Criterion | None]:
+        """ Unpacks a configuration code made by encode_config
+
+        :param args: a configuration code
+        :complexity: best/worst O(1)
+
+        This function returns the team numbers, battle mode, ai type and criterion stored in the code
+        """
+        team_numbers = [(code >> (3 * idx)) & 7 for idx in range(5)]
+        battle_mode = (code >> 15) & 3
+        ai_type = PokeTeam.AI(((code >> 17) & 3) + 1)
+        criterion_value = (code >> 19) & 7
+        criterion = Criterion(criterion_value) if criterion_value != 0 else None
+        return team_numbers, battle_mode, ai_type, criterion
+
+    @staticmethod
+    def config_type_mask(code: int) -> int:
+        """ Returns the pokemon types in a configuration code as a bitmask
+
+        :param args: a configuration code made by encode_config
+        :complexity: best/worst O(1)
+
+        Bit i is set if the team has at least one pokemon of PokeType(i).
+        """
+        mask = 0
+        for idx in range(5):
+            if (code >> (3 * idx)) & 7:
+                mask |= 1 << idx
+        return mask
+
+    @classmethod
+    def from_config_code(cls, team_name: str, code: int) -> PokeTeam:
+        """ Creates a freshly generated PokeTeam from a configuration code
+
+        :param args1: a string representing the name of the PokeTeam
+        :param args2: a configuration code made by encode_config
+        :complexity: same as PokeTeam.__init__
+        """
+        team_numbers, battle_mode, ai_type, criterion = cls.decode_config(code)
+        return PokeTeam(team_name, team_numbers, battle_mode, ai_type, criterion)
+
+    def get_config_code(self) -> int:
+        """ Returns the configuration code of the team
+        :complexity: best/worst O(1)
+        """
+        return self.encode_config(self.team_numbers, self.battle_mode, self.ai_type, self.criterion)
 
     def _generate_poke_team(self) -> ArraySortedList:
         """ Determines how many Charmanders/Bulbasaurs/Squirtles/Gastlys/Eevees should be added to the team.
@@ -391,4 +501,13 @@ class PokeTeam:
 
     @classmethod
     def leaderboard_team(cls):
-        raise NotImplementedError()
+        """ Returns the team used for the leaderboard
+
+        :complexity: best/worst O(1), the team has a fixed size
+
+        The configuration is the one found by team_optimizer.best_leaderboard_config, which searches every team
+        configuration against opponents drawn like those of leaderboard() but from other seeds, so the leaderboard
+        score is not fitted to its own opponents. Creating the team uses no random numbers, so the opponents stay the
+        same.
+        """
+        return cls.from_config_code("Leaderboard", cls.LEADERBOARD_CONFIG)
@@ -29,8 +29,10 @@ TEMPLATE_WINDOW = list(map(list, """\
  *O#OOOOOooooooooooooooooooooo**ooo*°*°....  .°oooooooooooooooooooOOOOO###o*********o*o*o***oooooooooooooooooooooooooooooooooooo**oO####OO.""".split(
     "\n")))
 
-import copy
 import os
+import re
+import sys
+from sprite_atlas import get_atlas, ATLAS_PATH, SPRITE_DIR
 
 os.system('')
 
@@ -44,6 +46,7 @@ STATUS_MAPPING = {
 }
 
 CLEAR = "\x1b[0m"
+ESCAPE_CODE = re.compile("\x1b\\[[0-9;]*m")
 
 HEALTH_HIGH = "\x1b[32m"
 HEALTH_MED = "\x1b[33m"
@@ -63,10 +66,139 @@ POKEMON_COLORS = {
 }
 
 
-def print_game_screen(team1_pokemon_name, team2_pokemon_name, team1_cur_hp, team1_max_hp, team2_cur_hp, team2_max_hp,
+class GameScreen:
+    """ Draws battle frames on a terminal, only rewriting the cells that changed since the last frame.
+
+        Attributes:
+            stream: where frames are written, sys.stdout at the time of drawing if None
+            rows (list[list[str]]): the raw cells of the last frame, with their escape codes
+            cells (list[list[tuple[str, str]]]): the (colour codes, character) shown in every cell
+            start_states, end_states (list[str]): the colour codes active at the start and end of every row
+
+        Colour codes in a cell carry on until a CLEAR, across cells and rows, exactly like the terminal prints them.
+        A row is only resolved again when its raw cells or the colour codes it starts with changed, and the cells that
+        differ are written with cursor addressing in a single write.
+    """
+
+    def __init__(self, stream=None) -> None:
+        self.stream = stream
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """ Forgets the last frame, so the next one is drawn in full. """
+        self.rows = None
+        self.cells = None
+        self.start_states = None
+        self.end_states = None
+
+    def draw(self, *args) -> None:
+        """ Draws a frame, taking the same arguments as print_game_screen. """
+        self.show(compose_game_screen(*args))
+
+    def show(self, window: list[list[str]]) -> None:
+        """ Draws any window of raw cells, such as the one made by compose_game_screen. """
+        stream = sys.stdout if self.stream is None else self.stream
+        if not stream.isatty():
+            stream.write("\n".join(map(lambda z: "".join(z), window)) + "\n")
+            return
+
+        out = []
+        if self.rows is None or len(self.rows) != len(window):
+            out.append("\x1b[H\x1b[2J")
+            self.rows = [None] * len(window)
+            self.cells = [[] for _ in window]
+            self.start_states = [None] * len(window)
+            self.end_states = [None] * len(window)
+
+        state = ""
+        for r in range(len(window)):
+            if window[r] == self.rows[r] and state == self.start_states[r]:
+                state = self.end_states[r]
+                continue
+            self.start_states[r] = state
+            self.rows[r] = window[r]
+            new_cells, state = _resolve_row(window[r], state)
+            self.end_states[r] = state
+            self._write_row_diff(out, r, new_cells)
+
+        out.append(CLEAR + "\x1b[" + str(len(window) + 1) + ";1H")
+        stream.write("".join(out))
+        stream.flush()
+
+    def _write_row_diff(self, out: list[str], r: int, new_cells: list[tuple[str, str]]) -> None:
+        """ Adds the cursor moves and characters that turn the shown row into new_cells. """
+        old_cells = self.cells[r]
+        if len(old_cells) < len(new_cells):
+            old_cells = old_cells + [None] * (len(new_cells) - len(old_cells))
+        style = None
+        c = 0
+        while c < len(new_cells):
+            if new_cells[c] == old_cells[c]:
+                c += 1
+                continue
+            out.append("\x1b[" + str(r + 1) + ";" + str(c + 1) + "H")
+            while c < len(new_cells) and new_cells[c] != old_cells[c]:
+                if new_cells[c][0] != style:
+                    style = new_cells[c][0]
+                    out.append(CLEAR + style)
+                out.append(new_cells[c][1])
+                c += 1
+        self.cells[r] = new_cells
+
+
+def _resolve_row(row: list[str], state: str) -> tuple[list[tuple[str, str]], str]:
+    """ Splits a row of raw cells into (colour codes, character), starting from the colour codes in state.
+        Returns the cells and the colour codes active at the end of the row.
+    """
+    cells = []
+    for cell in row:
+        if "\x1b" not in cell:
+            for char in cell:
+                cells.append((state, char))
+            continue
+        pos = 0
+        for match in ESCAPE_CODE.finditer(cell):
+            for char in cell[pos:match.start()]:
+                cells.append((state, char))
+            state = "" if match.group() == CLEAR else state + match.group()
+            pos = match.end()
+        for char in cell[pos:]:
+            cells.append((state, char))
+    return cells, state
+
+
+_SPRITES = {}
+
+
+def _load_sprite(sprite_name: str) -> list[str]:
+    """ Returns the lines of a sprite, looking it up only the first time.
+
+        :raises FileNotFoundError: if the sprite is neither in the atlas nor in pokemon_printing
+
+        Sprites come from the packed atlas (see sprite_atlas), or from pokemon_printing/<sprite_name>.txt when the
+        atlas was not built.
+    """
+    if sprite_name not in _SPRITES:
+        atlas = get_atlas()
+        if atlas is not None and sprite_name in atlas:
+            _SPRITES[sprite_name] = atlas.get_rows(sprite_name)
+        else:
+            path = os.path.join(SPRITE_DIR, sprite_name + ".txt")
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"No sprite {sprite_name}: it is not in {ATLAS_PATH} and there is no {path}. "
+                                        f"Put the sprites in {SPRITE_DIR} and run python sprite_atlas.py to pack them.")
+            with open(path, "r") as f:
+                _SPRITES[sprite_name] = f.read().split("\n")
+    return _SPRITES[sprite_name]
+
+
+_SCREEN = GameScreen()
+
+
+def compose_game_screen(team1_pokemon_name, team2_pokemon_name, team1_cur_hp, team1_max_hp, team2_cur_hp, team2_max_hp,
                       team1_lvl, team2_lvl, team1_status, team2_status, team1_remaining_pokemon,
                       team2_remaining_pokemon):
-    BATTLE_WINDOW = copy.deepcopy(TEMPLATE_WINDOW)
+    BATTLE_WINDOW = [row[:] for row in TEMPLATE_WINDOW]
     team1_pokemon_name = team1_pokemon_name.lower()
     team2_pokemon_name = team2_pokemon_name.lower()
     # NAMES
@@ -120,8 +252,7 @@ def print_game_screen(team1_pokemon_name, team2_pokemon_name, team1_cur_hp, team
 
     # SPRITES
     team1_color = POKEMON_COLORS[team1_pokemon_name]
-    with open("pokemon_printing/" + team1_pokemon_name + "_back.txt", "r") as f:
-        team1_lines = f.read().split("\n")
+    team1_lines = _load_sprite(team1_pokemon_name + "_back")
     team1_sprite_width = len(team1_lines[0])
     team1_sprite_height = len(team1_lines)
     for x in range(team1_sprite_height):
@@ -133,8 +264,7 @@ def print_game_screen(team1_pokemon_name, team2_pokemon_name, team1_cur_hp, team
                     CLEAR if y == team1_sprite_width - 1 else "")
 
     team2_color = POKEMON_COLORS[team2_pokemon_name]
-    with open("pokemon_printing/" + team2_pokemon_name + ".txt", "r") as f:
-        team2_lines = f.read().split("\n")
+    team2_lines = _load_sprite(team2_pokemon_name)
     team2_sprite_width = len(team2_lines[0])
     team2_sprite_height = len(team2_lines)
     for x in range(team2_sprite_height):
@@ -145,7 +275,14 @@ def print_game_screen(team1_pokemon_name, team2_pokemon_name, team1_cur_hp, team
                 BATTLE_WINDOW[xind][yind] = (team2_color if y == 0 else "") + team2_lines[x][y] + (
                     CLEAR if y == team2_sprite_width - 1 else "")
 
-    print("\n".join(map(lambda z: "".join(z), BATTLE_WINDOW)))
+    return BATTLE_WINDOW
+
+
+def print_game_screen(team1_pokemon_name, team2_pokemon_name, team1_cur_hp, team1_max_hp, team2_cur_hp, team2_max_hp,
+                      team1_lvl, team2_lvl, team1_status, team2_status, team1_remaining_pokemon,
+                      team2_remaining_pokemon):
+    _SCREEN.draw(team1_pokemon_name, team2_pokemon_name, team1_cur_hp, team1_max_hp, team2_cur_hp, team2_max_hp,
+                 team1_lvl, team2_lvl, team1_status, team2_status, team1_remaining_pokemon, team2_remaining_pokemon)
 
 
 if __name__ == "__main__":
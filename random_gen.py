@@ -38,6 +38,17 @@ class RandomGen():
         cls.seed = (cls.A * cls.seed + cls.C) % cls.MOD
         return cls.seed >> 16
 
+    @classmethod
+    def derive_seed(cls, seed, *keys):
+        """Returns a seed for an independent stream, deterministically mixed from `seed` and the integer `keys`."""
+        mask = (1 << 64) - 1
+        for key in keys:
+            x = (seed + 0x9E3779B97F4A7C15 * (key + 1)) & mask
+            x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & mask
+            x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & mask
+            seed = x ^ (x >> 31)
+        return seed % cls.MOD
+
     @classmethod
     def randint(cls, lo, hi):
         """Returns a random integer from `lo` to `hi` inclusive on both ends."""
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+"""
+Rates team configurations from a stream of battle results, with Elo or Glicko ratings that are updated as the results
+arrive. Results come as (team1 code, team2 code, result), such as from battle.battle_codes, a Tournament, a ResultStore,
+or leaderboard() and BattleTower.run_to_completion given a rating table as their store.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from array import array
+from typing import Iterable
+
+INITIAL_RATING = 1500.0
+
+# Glicko constants
+Q = math.log(10) / 400
+INITIAL_RD = 350.0
+MIN_RD = 30.0
+RD_GROWTH = 34.6
+
+
+class RatingTable(ABC):
+    """ Ratings of team configurations, stored in arrays with one slot per configuration code.
+
+        Attributes:
+            slots (dict[int, int]): slot of every configuration code
+            codes (array): configuration code of every slot
+            ratings (array): rating of every slot
+            games (array): number of battles of every slot
+            in_period (array): 1 for every slot that played in the current rating period
+            touched (list[int]): slots that played in the current rating period
+            period (int): number of rating periods that have ended
+            period_size (int | None): number of battles after which add ends the rating period by itself
+            period_games (int): number of battles added in the current rating period
+
+        add has the same first arguments as ResultStore.add, so a rating table can be given as the store of
+        leaderboard() or BattleTower.run_to_completion to rate their battles as they are played. Results that are
+        applied per period only show in the ratings once their period ends, so a table used as a store needs a
+        period_size, or end_period to be called after the run. Memory only grows with the number of different
+        configurations, never with the number of battles.
+    """
+
+    def __init__(self, period_size: int | None = None) -> None:
+        """ Initialisation
+
+            :param arg1: number of battles per rating period, periods only end through end_period if not given
+            :raises ValueError: if period_size is less than 1
+            :complexity: Best/Worst O(1)
+        """
+        if period_size is not None and period_size < 1:
+            raise ValueError("A rating period needs at least 1 battle")
+        self.slots = {}
+        self.codes = array("I")
+        self.ratings = array("d")
+        self.games = array("I")
+        self.in_period = array("b")
+        self.touched = []
+        self.period = 0
+        self.period_size = period_size
+        self.period_games = 0
+
+    def __len__(self) -> int:
+        """ Returns the number of rated configurations. """
+        return len(self.codes)
+
+    def add(self, team1_code: int, team2_code: int, battle_res: int, *args) -> None:
+        """ Adds the result of a battle.
+
+            :param arg1: configuration code of the first team
+            :param arg2: configuration code of the second team
+            :param arg3: the result of the battle, 1 if the first team won, 2 if the second team won and 0 for a draw
+            :complexity: Best/Worst O(1) amortised, plus end_period every period_size battles
+        """
+        score = 1.0 if battle_res == 1 else 0.0 if battle_res == 2 else 0.5
+        slot1 = self._slot(team1_code)
+        slot2 = self._slot(team2_code)
+        for slot in (slot1, slot2):
+            self.games[slot] += 1
+            if not self.in_period[slot]:
+                self.in_period[slot] = 1
+                self.touched.append(slot)
+        self._add_game(slot1, slot2, score)
+        self.period_games += 1
+        if self.period_size is not None and self.period_games >= self.period_size:
+            self.end_period()
+
+    def add_games(self, games: Iterable[tuple[int, int, int]], period_size: int | None = None) -> None:
+        """ Adds the results of many battles.
+
+            :param arg1: (team1 code, team2 code, result) of every battle
+            :param arg2: number of battles per rating period while they are added, the period_size of the table if not
+                         given
+            :complexity: Best/Worst O(g), where g is the number of battles
+        """
+        saved_period_size = self.period_size
+        if period_size is not None:
+            self.period_size = period_size
+        try:
+            for team1_code, team2_code, battle_res in games:
+                self.add(team1_code, team2_code, battle_res)
+        finally:
+            self.period_size = saved_period_size
+
+    def add_tournament(self, tournament) -> None:
+        """ Adds every match played so far in a tournament.
+            :complexity: Best/Worst O(M), where M is the number of matches played
+        """
+        plan = tournament.plan
+        for match_idx in range(tournament.match_idx):
+            node = plan.match_node(match_idx)
+            self.add(tournament.team_codes[tournament.winners[plan.left[node]]],
+                     tournament.team_codes[tournament.winners[plan.right[node]]], tournament.results[match_idx])
+
+    def add_store(self, store, source: str | None = None, period_size: int | None = None) -> None:
+        """ Adds the battles of a ResultStore, in the order they were stored.
+
+            :param arg1: the ResultStore
+            :param arg2: only add the battles from this source, such as "leaderboard"
+            :param arg3: number of battles per rating period, see add_games
+            :complexity: Best/Worst O(N), where N is the number of stored results
+        """
+        store.flush()
+        query = "SELECT team1_code, team2_code, result FROM battles"
+        params = ()
+        if source is not None:
+            query += " WHERE source = ?"
+            params = (source,)
+        self.add_games(store.connection.execute(query + " ORDER BY id", params), period_size)
+
+    def rating(self, code: int) -> float:
+        """ Returns the rating of a configuration, the initial rating if it has not played.
+            :complexity: Best/Worst O(1)
+        """
+        if code not in self.slots:
+            return INITIAL_RATING
+        return self.ratings[self.slots[code]]
+
+    def top(self, n: int = 10, min_games: int = 1) -> list[tuple[int, float, int]]:
+        """ Returns (code, rating, games) of the n best rated configurations.
+            :complexity: Best/Worst O(C log C), where C is the number of rated configurations
+        """
+        order = sorted((slot for slot in range(len(self)) if self.games[slot] >= min_games),
+                       key=lambda slot: -self.ratings[slot])
+        return [(self.codes[slot], self.ratings[slot], self.games[slot]) for slot in order[:n]]
+
+    def end_period(self) -> None:
+        """ Ends the current rating period, applying its results.
+            :complexity: Best/Worst O(t), where t is the number of configurations that played in the period
+        """
+        for slot in self.touched:
+            self._apply(slot)
+            self.in_period[slot] = 0
+        self.touched = []
+        self.period += 1
+        self.period_games = 0
+
+    def _slot(self, code: int) -> int:
+        """ Returns the slot of a configuration, adding it if it is new.
+            :complexity: Best/Worst O(1) amortised
+        """
+        slot = self.slots.get(code)
+        if slot is None:
+            slot = len(self.codes)
+            self.slots[code] = slot
+            self.codes.append(code)
+            self.ratings.append(INITIAL_RATING)
+            self.games.append(0)
+            self.in_period.append(0)
+            self._new_slot()
+        return slot
+
+    @abstractmethod
+    def _new_slot(self) -> None:
+        """ Adds the entries of a new slot to the arrays of the rating system.
+            :complexity: Best/Worst O(1) amortised in every rating system
+        """
+        pass
+
+    @abstractmethod
+    def _add_game(self, slot1: int, slot2: int, score: float) -> None:
+        """ Adds a battle where the first team scored score (1 win, 0.5 draw, 0 loss).
+            :complexity: Best/Worst O(1) in every rating system
+        """
+        pass
+
+    @abstractmethod
+    def _apply(self, slot: int) -> None:
+        """ Applies the results of the current period to a slot.
+            :complexity: Best/Worst O(1) in every rating system
+        """
+        pass
+
+
+class EloRatings(RatingTable):
+    """ Elo ratings, updated after every battle or once per rating period.
+
+        Attributes:
+            k (float): most rating points a battle can move
+            batched (bool): True to apply the changes at the end of every period, against the ratings of its start
+            pending (array): rating change of every slot in the current period
+    """
+
+    def __init__(self, k: float = 32, batched: bool = False, period_size: int | None = None) -> None:
+        """ Initialisation
+
+            :complexity: Best/Worst O(1)
+        """
+        RatingTable.__init__(self, period_size)
+        self.k = k
+        self.batched = batched
+        self.pending = array("d")
+
+    def expected(self, code1: int, code2: int) -> float:
+        """ Returns the expected score of the first configuration against the second.
+            :complexity: Best/Worst O(1)
+        """
+        return 1 / (1 + 10 ** ((self.rating(code2) - self.rating(code1)) / 400))
+
+    def _new_slot(self) -> None:
+        """ Adds the pending change of a new slot.
+            :complexity: Best/Worst O(1) amortised
+        """
+        self.pending.append(0.0)
+
+    def _add_game(self, slot1: int, slot2: int, score: float) -> None:
+        """ Moves both ratings by k times the surprise of the result, or adds the change to pending when batched.
+            :complexity: Best/Worst O(1)
+        """
+        expected = 1 / (1 + 10 ** ((self.ratings[slot2] - self.ratings[slot1]) / 400))
+        change = self.k * (score - expected)
+        if self.batched:
+            self.pending[slot1] += change
+            self.pending[slot2] -= change
+        else:
+            self.ratings[slot1] += change
+            self.ratings[slot2] -= change
+
+    def _apply(self, slot: int) -> None:
+        """ Adds the pending change of a slot to its rating.
+            :complexity: Best/Worst O(1)
+        """
+        self.ratings[slot] += self.pending[slot]
+        self.pending[slot] = 0.0
+
+
+class GlickoRatings(RatingTable):
+    """ Glicko ratings, where every configuration also has a rating deviation that shrinks as it plays.
+
+        Attributes:
+            deviations (array): rating deviation of every slot at the end of the period it last played in
+            last_period (array): period every slot last played in, or was added in
+            variance_sums (array): sum of g^2 E (1 - E) over the battles of every slot in the current period
+            score_sums (array): sum of g (s - E) over the battles of every slot in the current period
+
+        Battles are collected for a whole rating period and applied by end_period, or every period_size battles. At the
+        start of every period, the deviation of a configuration grows by RD_GROWTH for every period since the one it
+        last played in, as in step 1 of Glicko. This is worked out when the deviation is next used rather than every
+        period, so ending a period only touches the configurations that played in it.
+    """
+
+    def __init__(self, rd_growth: float = RD_GROWTH, period_size: int | None = None) -> None:
+        """ Initialisation
+
+            :param arg1: growth of the deviation per rating period
+            :param arg2: number of battles per rating period, see RatingTable
+            :complexity: Best/Worst O(1)
+        """
+        RatingTable.__init__(self, period_size)
+        self.rd_growth = rd_growth
+        self.deviations = array("d")
+        self.last_period = array("l")
+        self.variance_sums = array("d")
+        self.score_sums = array("d")
+
+    def deviation(self, code: int) -> float:
+        """ Returns the rating deviation a configuration has in the current period.
+            :complexity: Best/Worst O(1)
+        """
+        if code not in self.slots:
+            return INITIAL_RD
+        return self._deviation(self.slots[code])
+
+    def _deviation(self, slot: int) -> float:
+        """ Returns the deviation of a slot, grown for every period since the one it last played in.
+            :complexity: Best/Worst O(1)
+        """
+        idle = self.period - self.last_period[slot]
+        return min(math.sqrt(self.deviations[slot] ** 2 + self.rd_growth ** 2 * idle), INITIAL_RD)
+
+    def _new_slot(self) -> None:
+        """ Adds the deviation, last period and sums of a new slot, which starts with INITIAL_RD.
+            :complexity: Best/Worst O(1) amortised
+        """
+        self.deviations.append(INITIAL_RD)
+        self.last_period.append(self.period)
+        self.variance_sums.append(0.0)
+        self.score_sums.append(0.0)
+
+    def _add_game(self, slot1: int, slot2: int, score: float) -> None:
+        """ Adds the variance and score terms of a battle to the sums of both slots, against the deviation each
+            opponent has in the current period.
+            :complexity: Best/Worst O(1)
+        """
+        for slot, opponent, slot_score in ((slot1, slot2, score), (slot2, slot1, 1 - score)):
+            g = 1 / math.sqrt(1 + 3 * Q * Q * self._deviation(opponent) ** 2 / (math.pi ** 2))
+            expected = 1 / (1 + 10 ** (-g * (self.ratings[slot] - self.ratings[opponent]) / 400))
+            self.variance_sums[slot] += g * g * expected * (1 - expected)
+            self.score_sums[slot] += g * (slot_score - expected)
+
+    def _apply(self, slot: int) -> None:
+        """ Updates the rating and deviation of a slot from the sums of the period, as in step 2 of Glicko, and resets
+            the sums.
+            :complexity: Best/Worst O(1)
+        """
+        precision = 1 / self._deviation(slot) ** 2 + Q * Q * self.variance_sums[slot]
+        self.ratings[slot] += Q / precision * self.score_sums[slot]
+        self.deviations[slot] = max(math.sqrt(1 / precision), MIN_RD)
+        self.last_period[slot] = self.period
+        self.variance_sums[slot] = 0.0
+        self.score_sums[slot] = 0.0
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+"""
+Draws battle frames on a separate thread, so battles run at full speed while they are being watched.
+"""
+
+import queue
+import threading
+import time
+from print_screen import GameScreen
+
+_STOP = object()
+
+
+class RenderThread:
+    """ Consumer thread that draws the latest turn snapshot of a battle at up to a target frame rate.
+
+        Attributes:
+            screen (GameScreen): the screen frames are drawn on
+            fps (float | None): most frames drawn per second, as fast as the terminal allows if None
+            snapshots (queue.Queue): bounded queue of snapshots waiting to be drawn
+            frames_drawn (int): number of snapshots drawn
+            frames_dropped (int): number of snapshots skipped because a newer one was waiting
+
+        A snapshot is the tuple of arguments of print_game_screen. When the terminal falls behind, the queue fills up
+        and the oldest snapshots are dropped, so the battle never waits for the terminal and the view always catches up
+        to the latest turn. The last snapshot submitted is always drawn before close returns.
+    """
+
+    def __init__(self, fps: float | None = 30, max_pending: int = 8, screen: GameScreen | None = None) -> None:
+        """ Initialisation, the thread is started straight away.
+
+            :param arg1: most frames drawn per second
+            :param arg2: most snapshots waiting to be drawn
+            :param arg3: the screen to draw on, a new one on the standard output if not given
+            :complexity: Best/Worst O(1)
+        """
+        self.screen = GameScreen() if screen is None else screen
+        self.fps = fps
+        self.snapshots = queue.Queue(max(1, max_pending))
+        self.frames_drawn = 0
+        self.frames_dropped = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="RenderThread", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> RenderThread:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def submit(self, snapshot: tuple) -> None:
+        """ Queues a snapshot to be drawn, dropping the oldest waiting one if the queue is full.
+
+            :param arg1: the arguments of print_game_screen for the turn
+            :complexity: Best/Worst O(1), it never blocks on the terminal
+        """
+        with self._lock:
+            while True:
+                try:
+                    self.snapshots.put_nowait(snapshot)
+                    return
+                except queue.Full:
+                    try:
+                        self.snapshots.get_nowait()
+                        self.frames_dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def close(self) -> None:
+        """ Draws the last snapshot submitted and stops the thread. """
+        if self._thread.is_alive():
+            self.submit(_STOP)
+            self._thread.join()
+
+    def _run(self) -> None:
+        """ Draws the newest waiting snapshot, then waits for the next frame slot. """
+        frame_time = 1 / self.fps if self.fps else 0
+        next_frame = time.monotonic()
+        stop = False
+        while not stop:
+            snapshot = self.snapshots.get()
+            latest, stop = self._take_newest(None if snapshot is _STOP else snapshot)
+            stop = stop or snapshot is _STOP
+            delay = next_frame - time.monotonic()
+            if delay > 0 and not stop:
+                time.sleep(delay)
+                latest, stop = self._take_newest(latest)
+            if latest is not None:
+                self.screen.draw(*latest)
+                self.frames_drawn += 1
+                next_frame = max(next_frame + frame_time, time.monotonic())
+
+    def _take_newest(self, latest: tuple | None) -> tuple[tuple | None, bool]:
+        """ Empties the queue, keeping only the newest snapshot.
+            Returns the newest snapshot and whether close was called.
+        """
+        stop = False
+        with self._lock:
+            while not self.snapshots.empty():
+                snapshot = self.snapshots.get_nowait()
+                if snapshot is _STOP:
+                    stop = True
+                else:
+                    if latest is not None:
+                        self.frames_dropped += 1
+                    latest = snapshot
+        return latest, stop
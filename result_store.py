@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+"""
+Keeps battle results in an SQLite database, so they can be analysed later without playing the battles again.
+"""
+
+import sqlite3
+from poke_team import PokeTeam
+
+BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS battles (
+    id INTEGER PRIMARY KEY,
+    source TEXT,
+    team1_code INTEGER NOT NULL,
+    team2_code INTEGER NOT NULL,
+    mode1 INTEGER NOT NULL,
+    mode2 INTEGER NOT NULL,
+    criterion1 INTEGER NOT NULL,
+    criterion2 INTEGER NOT NULL,
+    seed INTEGER,
+    result INTEGER NOT NULL,
+    turns INTEGER
+);
+CREATE INDEX IF NOT EXISTS battles_team1 ON battles (team1_code, mode2, criterion2, result);
+CREATE INDEX IF NOT EXISTS battles_team2 ON battles (team2_code, mode1, criterion1, result);
+CREATE INDEX IF NOT EXISTS battles_seed ON battles (seed);
+CREATE INDEX IF NOT EXISTS battles_result ON battles (result);
+"""
+
+INSERT = "INSERT INTO battles (source, team1_code, team2_code, mode1, mode2, criterion1, criterion2, seed, result, " \
+         "turns) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+def _mode_and_criterion(code: int) -> tuple[int, int]:
+    """ Returns the battle mode and criterion value stored in a configuration code, 0 when there is no criterion
+
+        :param arg1: a configuration code, see PokeTeam.encode_config
+        :complexity: Best/Worst O(1)
+    """
+    _, battle_mode, _, criterion = PokeTeam.decode_config(code)
+    return battle_mode, 0 if criterion is None else criterion.value
+
+
+class ResultStore:
+    """ SQLite store of battle results, keyed by the configuration codes of the two teams.
+
+        Attributes:
+            connection (sqlite3.Connection): the database
+            batch_size (int): number of results written per transaction
+            pending (list[tuple]): results waiting to be written
+
+        The battle mode and criterion of both teams are stored next to their codes (criterion 0 when there is none),
+        so questions like "how often does this team beat battle mode 2 teams" are answered from an index. A seed is
+        the RandomGen seed the battle started from, so battle.battle_codes(team1_code, team2_code, seed) plays it
+        again when the teams were freshly generated.
+    """
+
+    def __init__(self, path: str = ":memory:", batch_size: int = BATCH_SIZE) -> None:
+        """ Initialisation
+
+            :param arg1: path of the database file, in memory if not given
+            :param arg2: number of results written per transaction
+            :complexity: Best/Worst O(1)
+        """
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.pending = []
+
+    def __enter__(self) -> ResultStore:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def add(self, team1_code: int, team2_code: int, battle_res: int, seed: int | None = None,
+            turns: int | None = None, source: str | None = None) -> None:
+        """ Adds the result of a battle, writing the pending results once there are batch_size of them.
+
+            :param arg1: configuration code of the first team
+            :param arg2: configuration code of the second team
+            :param arg3: the result of the battle
+            :param arg4: the RandomGen seed the battle started from
+            :param arg5: number of turns the battle took
+            :param arg6: where the battle comes from, such as "leaderboard"
+            :complexity: Best O(1) amortised, Worst O(b log N) when the batch is written, where b is batch_size and N
+                         is the number of stored results
+        """
+        mode1, criterion1 = _mode_and_criterion(team1_code)
+        mode2, criterion2 = _mode_and_criterion(team2_code)
+        self.pending.append((source, team1_code, team2_code, mode1, mode2, criterion1, criterion2, seed, battle_res,
+                             turns))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def add_tournament(self, tournament, source: str = "tournament") -> None:
+        """ Adds every match played so far in a tournament.
+
+            :param arg1: a started Tournament
+            :param arg2: where the battles come from
+            :complexity: Best/Worst O(M), where M is the number of matches played
+        """
+        plan = tournament.plan
+        for match_idx in range(tournament.match_idx):
+            node = plan.match_node(match_idx)
+            self.add(tournament.team_codes[tournament.winners[plan.left[node]]],
+                     tournament.team_codes[tournament.winners[plan.right[node]]],
+                     tournament.results[match_idx], source=source)
+
+    def flush(self) -> None:
+        """ Writes the pending results in one transaction.
+            :complexity: Best/Worst O(b log N), where b is the number of pending results and N is the number of stored
+                         results
+        """
+        if self.pending:
+            with self.connection:
+                self.connection.executemany(INSERT, self.pending)
+            self.pending = []
+
+    def close(self) -> None:
+        """ Writes the pending results and closes the database. """
+        self.flush()
+        self.connection.close()
+
+    def count(self) -> int:
+        """ Returns the number of stored results. """
+        self.flush()
+        return self.connection.execute("SELECT COUNT(*) FROM battles").fetchone()[0]
+
+    def record(self, team_code: int, opponent_mode: int | None = None,
+               opponent_criterion=None) -> tuple[int, int, int]:
+        """ Returns how many battles a team won, drew and lost, from either side.
+
+            :param arg1: configuration code of the team
+            :param arg2: only count opponents with this battle mode
+            :param arg3: only count opponents with this Criterion
+            :complexity: Best/Worst O(log N + k), where N is the number of stored results and k is the number of
+                         battles counted, since both sides are read from an index
+        """
+        self.flush()
+        won = drawn = lost = 0
+        for own, opponent, win_result in (("team1", "2", 1), ("team2", "1", 2)):
+            query = f"SELECT result, COUNT(*) FROM battles WHERE {own}_code = ?"
+            params = [team_code]
+            if opponent_mode is not None:
+                query += f" AND mode{opponent} = ?"
+                params.append(opponent_mode)
+            if opponent_criterion is not None:
+                query += f" AND criterion{opponent} = ?"
+                params.append(opponent_criterion.value)
+            for battle_res, battles in self.connection.execute(query + " GROUP BY result", params):
+                if battle_res == win_result:
+                    won += battles
+                elif battle_res == 0:
+                    drawn += battles
+                else:
+                    lost += battles
+        return won, drawn, lost
+
+    def win_rate(self, team_code: int, opponent_mode: int | None = None, opponent_criterion=None) -> float:
+        """ Returns the fraction of its battles a team won, see record. 0 if it has not played.
+            :complexity: same as record
+        """
+        won, drawn, lost = self.record(team_code, opponent_mode, opponent_criterion)
+        played = won + drawn + lost
+        return won / played if played else 0.0
+
+    def battles_with_seed(self, seed: int) -> list[tuple[int, int, int]]:
+        """ Returns (team1 code, team2 code, result) of the battles that started from a seed.
+            :complexity: Best/Worst O(log N + k), where k is the number of such battles
+        """
+        self.flush()
+        return self.connection.execute("SELECT team1_code, team2_code, result FROM battles WHERE seed = ?",
+                                       (seed,)).fetchall()
+
+    def best_teams(self, top: int = 10, min_played: int = 1) -> list[tuple[int, int, int]]:
+        """ Returns (code, won, played) of the teams that won the largest fraction of their battles as team 1.
+            :complexity: Best/Worst O(N), where N is the number of stored results
+        """
+        self.flush()
+        return self.connection.execute(
+            "SELECT team1_code, SUM(result = 1), COUNT(*) FROM battles GROUP BY team1_code HAVING COUNT(*) >= ? "
+            "ORDER BY 1.0 * SUM(result = 1) / COUNT(*) DESC, COUNT(*) DESC LIMIT ?", (min_played, top)).fetchall()
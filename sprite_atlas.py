@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+"""
+Packs every pokemon sprite into a single atlas file, which is memory mapped once so frames never read sprite files.
+
+The atlas starts with a header (magic, version, number of sprites), followed by the index of every sprite (name,
+offset and length of its text) and then the text of all the sprites one after another. Run this module to build the
+atlas from the pokemon_printing directory.
+"""
+
+import mmap
+import os
+import pkgutil
+import struct
+
+ATLAS_MAGIC = b"PKSA"
+ATLAS_VERSION = 1
+ATLAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sprites.atlas")
+SPRITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pokemon_printing")
+
+HEADER = struct.Struct("<4sHI")
+ENTRY = struct.Struct("<II")
+NAME_LENGTH = struct.Struct("<H")
+
+
+def build_atlas(source_dir: str = SPRITE_DIR, path: str = ATLAS_PATH) -> int:
+    """ Packs the sprite files of a directory into an atlas file.
+
+        :param arg1: directory with a <name>.txt and <name>_back.txt file for every pokemon
+        :param arg2: path of the atlas file to write
+        :raises FileNotFoundError: if there is no such directory or it has no sprites
+        :complexity: Best/Worst O(S), where S is the total size of the sprite files
+
+        The sprites are named after their file without the .txt, and the file is replaced atomically. The function
+        returns the number of sprites packed.
+    """
+    if not os.path.isdir(source_dir):
+        raise FileNotFoundError(f"No sprite directory {source_dir} to build the atlas from")
+    names = sorted(file_name[:-4] for file_name in os.listdir(source_dir) if file_name.endswith(".txt"))
+    if not names:
+        raise FileNotFoundError(f"No sprites in {source_dir} to build the atlas from")
+    texts = []
+    for name in names:
+        with open(os.path.join(source_dir, name + ".txt"), "rb") as f:
+            texts.append(f.read())
+
+    index = [HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, len(names))]
+    offset = 0
+    for idx in range(len(names)):
+        encoded_name = names[idx].encode("utf-8")
+        index.append(NAME_LENGTH.pack(len(encoded_name)) + encoded_name + ENTRY.pack(offset, len(texts[idx])))
+        offset += len(texts[idx])
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(index))
+        f.write(b"".join(texts))
+    os.replace(tmp_path, path)
+    return len(names)
+
+
+class SpriteAtlas:
+    """ Read-only view of an atlas file.
+
+        Attributes:
+            data: the memory mapped atlas, or its bytes when it is inside a zip
+            index (dict[str, tuple[int, int]]): (offset, length) of the text of every sprite
+            rows (dict[str, list[str]]): the lines of every sprite already split
+    """
+
+    def __init__(self, data) -> None:
+        """ Initialisation
+
+            :param arg1: the contents of an atlas file
+            :raises ValueError: if the data is not an atlas
+            :complexity: Best/Worst O(n), where n is the number of sprites
+        """
+        magic, version, count = HEADER.unpack_from(data, 0)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            raise ValueError("Not a sprite atlas")
+        self.data = data
+        self.index = {}
+        self.rows = {}
+        pos = HEADER.size
+        entries = []
+        for _ in range(count):
+            name_length, = NAME_LENGTH.unpack_from(data, pos)
+            pos += NAME_LENGTH.size
+            name = bytes(data[pos:pos + name_length]).decode("utf-8")
+            pos += name_length
+            entries.append((name, ENTRY.unpack_from(data, pos)))
+            pos += ENTRY.size
+        for name, (offset, length) in entries:
+            self.index[name] = (pos + offset, length)
+
+    @classmethod
+    def open(cls, path: str = ATLAS_PATH) -> SpriteAtlas | None:
+        """ Opens an atlas, memory mapping it when it is a plain file.
+
+            :param arg1: path of the atlas file
+            :complexity: Best/Worst O(n), where n is the number of sprites
+
+            When the module is imported from a zip or wheel the atlas is read through pkgutil instead. None is returned
+            if there is no atlas.
+        """
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        try:
+            data = pkgutil.get_data(__name__, os.path.basename(path))
+        except OSError:
+            data = None
+        if data is None:
+            return None
+        return cls(data)
+
+    def __contains__(self, name: str) -> bool:
+        """ True if the atlas has a sprite with this name. """
+        return name in self.index
+
+    def get_rows(self, name: str) -> list[str]:
+        """ Returns the lines of a sprite, splitting its text only the first time.
+
+            :param arg1: name of the sprite, such as "charmander" or "charmander_back"
+            :raises KeyError: if the atlas has no such sprite
+            :complexity: Best O(1) once split, Worst O(s), where s is the size of the sprite
+        """
+        if name not in self.rows:
+            offset, length = self.index[name]
+            self.rows[name] = bytes(self.data[offset:offset + length]).decode("utf-8").split("\n")
+        return self.rows[name]
+
+
+_ATLAS = None
+_ATLAS_LOADED = False
+
+
+def get_atlas() -> SpriteAtlas | None:
+    """ Returns the atlas next to this module, opening it the first time, or None if it was not built. """
+    global _ATLAS, _ATLAS_LOADED
+    if not _ATLAS_LOADED:
+        _ATLAS = SpriteAtlas.open()
+        _ATLAS_LOADED = True
+    return _ATLAS
+
+
+if __name__ == "__main__":
+    print(f"Packed {build_atlas()} sprites into {ATLAS_PATH}")
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+"""
+Searches every team configuration for the one that does best against teams drawn like the leaderboard opponents, using
+successive halving so most battles are spent on the most promising configurations.
+
+The search plays its own sample of opponents, drawn from the same distribution as those of leaderboard() but from
+independent seeds, so the score leaderboard() reports for the winner is measured on teams the search never saw.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from battle import battle_codes
+from poke_team import PokeTeam, Criterion
+from random_gen import RandomGen
+
+LEADERBOARD_SEED = (1 << 16) + 1029348
+LEADERBOARD_OPPONENTS = 1000
+SEARCH_SEED = 7
+MAX_TEAM_SIZE = 6
+
+
+def all_configs() -> list[int]:
+    """ Returns the configuration code of every team that can play on its own.
+
+        :complexity: Best/Worst O(C), where C is the number of configurations
+
+        Every split of 1 to 6 pokemon between the 5 kinds is combined with every battle mode and ai type. A criterion
+        is only used in battle mode 2, where it orders the team, and user input is left out since nobody is there to
+        answer it.
+    """
+    ai_types = [ai_type for ai_type in PokeTeam.AI if ai_type != PokeTeam.AI.USER_INPUT]
+    configs = []
+    for team_numbers in _team_numbers(5, MAX_TEAM_SIZE):
+        if sum(team_numbers) == 0:
+            continue
+        for battle_mode in range(3):
+            criteria = list(Criterion) if battle_mode == 2 else [None]
+            for criterion in criteria:
+                for ai_type in ai_types:
+                    configs.append(PokeTeam.encode_config(team_numbers, battle_mode, ai_type, criterion))
+    return configs
+
+
+def _team_numbers(kinds: int, most: int) -> list[list[int]]:
+    """ Returns every list of kinds numbers that add up to at most most.
+        :complexity: Best/Worst O(C), where C is the number of such lists
+    """
+    if kinds == 0:
+        return [[]]
+    splits = []
+    for first in range(most + 1):
+        for rest in _team_numbers(kinds - 1, most - first):
+            splits.append([first] + rest)
+    return splits
+
+
+def leaderboard_opponents(n: int = LEADERBOARD_OPPONENTS) -> list[int]:
+    """ Returns the configuration codes of the teams leaderboard() plays against, in order.
+
+        :param arg1: number of opponents
+        :complexity: Best/Worst O(n)
+
+        The codes are drawn with the same random numbers as the teams of leaderboard(). The random generator is left
+        as it was.
+    """
+    saved_seed = RandomGen.seed
+    RandomGen.set_seed(LEADERBOARD_SEED)
+    opponents = [_draw_opponent() for _ in range(n)]
+    RandomGen.seed = saved_seed
+    return opponents
+
+
+def search_opponents(n: int = LEADERBOARD_OPPONENTS, seed: int = SEARCH_SEED) -> list[int]:
+    """ Returns the configuration codes of the teams the search plays against.
+
+        :param arg1: number of opponents
+        :param arg2: base seed, opponent i is drawn from RandomGen.derive_seed(seed, i)
+        :complexity: Best/Worst O(n)
+
+        The codes are drawn the same way as those of leaderboard_opponents, but every opponent has its own seed, so
+        none of them is one of the leaderboard opponents. The random generator is left as it was.
+    """
+    saved_seed = RandomGen.seed
+    opponents = []
+    for idx in range(n):
+        RandomGen.set_seed(RandomGen.derive_seed(seed, idx))
+        opponents.append(_draw_opponent())
+    RandomGen.seed = saved_seed
+    return opponents
+
+
+def _draw_opponent() -> int:
+    """ Draws the configuration code of a team the way leaderboard() draws its opponents.
+        :complexity: Best/Worst O(1)
+    """
+    battle_mode = RandomGen.randint(0, 2)
+    criterion = Criterion(RandomGen.randint(1, len(Criterion)))
+    return PokeTeam.random_config(battle_mode, criterion=criterion)
+
+
+def _score_chunk(codes: list[int], opponents: list[int], first: int, seed: int) -> list[tuple[int, int]]:
+    """ Plays every configuration of a chunk against a run of opponents in a worker process.
+
+        :param arg1: configuration codes to score
+        :param arg2: the opponents to play, opponent i of the run is opponent first + i of the whole list
+        :param arg3: index of the first opponent in the whole list
+        :param arg4: base seed of the search
+        :complexity: Best/Worst O(k*m*B), where k is len(codes), m is len(opponents) and B is the time complexity of
+                     running a battle.
+
+        The function returns (wins, draws) of every configuration.
+    """
+    scores = []
+    for code in codes:
+        wins = 0
+        draws = 0
+        for idx in range(len(opponents)):
+            battle_res = battle_codes(code, opponents[idx], RandomGen.derive_seed(seed, code, first + idx))
+            if battle_res == 1:
+                wins += 1
+            elif battle_res == 0:
+                draws += 1
+        scores.append((wins, draws))
+    return scores
+
+
+def successive_halving(configs: list[int], opponents: list[int], seed: int = 0, first_battles: int = 4,
+                       keep: float = 0.5, max_workers: int | None = None, chunk_size: int = 64) -> list[tuple[int, int, int, int]]:
+    """ Finds the configurations that win the most battles against a list of opponents.
+
+        :param arg1: configuration codes to search
+        :param arg2: configuration codes of the opponents
+        :param arg3: base seed, the battle of a configuration against opponent i uses RandomGen.derive_seed(seed, code, i)
+        :param arg4: number of opponents every configuration plays in the first round
+        :param arg5: fraction of configurations kept after every round
+        :param arg6: number of worker processes, 1 plays every battle in this process
+        :param arg7: number of configurations sent to a worker at once
+        :complexity: Best/Worst O(R*C*f*B), where R is the number of rounds, C is len(configs), f is first_battles and
+                     B is the time complexity of running a battle, spread over the workers, since every round plays
+                     about as many battles as the first one.
+
+        Every round, the configurations still in the search play the next opponents, twice as many as in the round
+        before, and only the best fraction of them by wins, then draws, goes on. The last round plays the rest of the
+        opponents, so the configurations left have all played every opponent. Every battle has its own seed, so the
+        result does not depend on the number of workers. The function returns (code, wins, draws, played) of the
+        configurations of the last round, best first.
+    """
+    wins = {code: 0 for code in configs}
+    draws = {code: 0 for code in configs}
+    alive = list(configs)
+    played = 0
+    battles = first_battles
+    pool = None if max_workers == 1 else ProcessPoolExecutor(max_workers=max_workers)
+    saved_seed = RandomGen.seed
+    try:
+        while played < len(opponents):
+            if len(alive) <= 1 / keep:
+                battles = len(opponents) - played
+            battles = min(battles, len(opponents) - played)
+            run = opponents[played:played + battles]
+            chunks = [alive[idx:idx + chunk_size] for idx in range(0, len(alive), chunk_size)]
+            if pool is None:
+                results = [_score_chunk(chunk, run, played, seed) for chunk in chunks]
+            else:
+                results = pool.map(_score_chunk, chunks, [run] * len(chunks), [played] * len(chunks),
+                                   [seed] * len(chunks))
+            for chunk, scores in zip(chunks, results):
+                for code, (chunk_wins, chunk_draws) in zip(chunk, scores):
+                    wins[code] += chunk_wins
+                    draws[code] += chunk_draws
+            played += battles
+            battles *= 2
+
+            alive.sort(key=lambda code: (-wins[code], -draws[code]))
+            if played < len(opponents):
+                alive = alive[:max(1, int(len(alive) * keep))]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        RandomGen.seed = saved_seed
+    return [(code, wins[code], draws[code], played) for code in alive]
+
+
+def best_leaderboard_config(seed: int = 0, max_workers: int | None = None, opponent_seed: int = SEARCH_SEED) -> int:
+    """ Returns the configuration code that does best against the search opponents, see successive_halving.
+
+        :param arg1: base seed of the battles
+        :param arg2: number of worker processes, 1 plays every battle in this process
+        :param arg3: base seed of the opponents, see search_opponents
+        :complexity: Best/Worst O(R*C*B), see successive_halving
+
+        PokeTeam.LEADERBOARD_CONFIG is the result with the default arguments, which running this module prints again.
+    """
+    return successive_halving(all_configs(), search_opponents(seed=opponent_seed), seed, max_workers=max_workers)[0][0]
+
+
+if __name__ == "__main__":
+    workers = os.cpu_count() or 1
+    finalists = successive_halving(all_configs(), search_opponents(), max_workers=workers)
+    for code, won, drawn, total in finalists:
+        team_numbers, battle_mode, ai_type, criterion = PokeTeam.decode_config(code)
+        print(code, team_numbers, battle_mode, ai_type.name, criterion, f"{100 * won / total:.2f}%")
+    best = finalists[0][0]
+    held_out = leaderboard_opponents()
+    won, drawn = _score_chunk([best], held_out, 0, 0)[0]
+    print(f"{best} against the leaderboard opponents: {100 * won / len(held_out):.2f}%")
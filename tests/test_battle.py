@@ -0,0 +1,57 @@
+""" Tests for the turn records Battle writes to a TurnLog. """
+
+import io
+import json
+import unittest
+from battle import Battle
+from poke_team import Action, PokeTeam, Criterion
+from random_gen import RandomGen
+from turn_log import TurnLog
+
+
+class TestTurnLog(unittest.TestCase):
+    """ Tests that every turn of a battle, including the one that decides it, is written once. """
+    BATTLES = 60
+
+    def setUp(self):
+        RandomGen.set_seed(2023)
+        self.stream = io.StringIO()
+        self.battle = Battle(turn_log=TurnLog(self.stream))
+
+    def play(self, team1, team2):
+        """ Plays a battle and returns its result, turn count and records. """
+        start = self.stream.tell()
+        battle_res = self.battle.battle(team1, team2)
+        records = [json.loads(line) for line in self.stream.getvalue()[start:].splitlines()]
+        return battle_res, self.battle.turn_count, records
+
+    def check(self, battle_res, turn_count, records):
+        """ One record for the start and one for every turn played, then the result. """
+        turns = [record for record in records if "result" not in record]
+        self.assertEqual(len(turns) - 1, turn_count)
+        self.assertEqual([record["turn"] for record in turns], list(range(turn_count + 1)))
+        self.assertIsNone(turns[0]["actions"])
+        self.assertEqual(records[-1], {"battle": self.battle.battle_id, "turn": turn_count, "result": battle_res})
+
+    def test_every_mode(self):
+        """ Battles between every pair of battle modes. """
+        for idx in range(self.BATTLES):
+            mode1 = idx % 3
+            mode2 = (idx // 3) % 3
+            team1 = PokeTeam.random_team("A", mode1, criterion=Criterion.HP if mode1 == 2 else None)
+            team2 = PokeTeam.random_team("B", mode2, criterion=Criterion.SPD if mode2 == 2 else None)
+            self.check(*self.play(team1, team2))
+
+    def test_heal_limit(self):
+        """ A team that heals a fourth time loses during that turn. """
+        team1 = PokeTeam.random_team("A", 0, ai_mode=PokeTeam.AI.ALWAYS_ATTACK)
+        team2 = PokeTeam.random_team("B", 0, ai_mode=PokeTeam.AI.ALWAYS_ATTACK)
+        team2.choose_battle_option = lambda my_pokemon, their_pokemon: Action.HEAL
+        battle_res, turn_count, records = self.play(team1, team2)
+        self.assertEqual(battle_res, 1)
+        self.check(battle_res, turn_count, records)
+        self.assertEqual(records[-2]["actions"], ["ATTACK", "HEAL"])
+
+
+if __name__ == '__main__':
+    unittest.main()
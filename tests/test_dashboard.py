@@ -0,0 +1,48 @@
+""" Tests for BattleBoard and the BoardChannel that battles in other processes report to it through. """
+
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from battle import battle_codes
+from dashboard import BattleBoard, BoardChannel
+
+
+class TestBattleBoard(unittest.TestCase):
+    """ Tests that updates from this process and from worker processes reach the board. """
+
+    def setUp(self):
+        self.board = BattleBoard()
+
+    def tearDown(self):
+        self.board.close()
+
+    def test_slot(self):
+        slot = self.board.slot(1, "A vs B")
+        slot.submit(("a",))
+        self.assertEqual(self.board.copy(), [("A vs B", ("a",), None)])
+        slot.finish(2)
+        self.board.remove(1)
+        slot.submit(("b",))
+        self.assertEqual(self.board.copy(), [])
+
+    def test_channel(self):
+        channel = self.board.channel()
+        self.assertIsInstance(channel, BoardChannel)
+        self.assertIs(self.board.channel(), channel)
+        slot = channel.slot(3, "C vs D")
+        slot.submit(("c",))
+        slot.finish(0)
+        self.assertEqual(self.board.copy(), [("C vs D", ("c",), 0)])
+
+    def test_workers(self):
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(battle_codes, [10, 20], [30, 40], [1, 2], [self.board.channel()] * 2))
+        self.assertEqual(results, [battle_codes(10, 30, 1), battle_codes(20, 40, 2)])
+        rows = self.board.copy()
+        self.assertGreaterEqual(len(rows), 1)
+        self.assertTrue(all(snapshot is not None and battle_res in results for _, snapshot, battle_res in rows))
+        self.assertTrue(all(pid != os.getpid() for pid in self.board.labels))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+""" Tests for RoundRobinLeague, SwissLeague and the PairingScheduler they play their rounds with. """
+
+import unittest
+from league import RoundRobinLeague, SwissLeague, PairingScheduler, WIN_POINTS, DRAW_POINTS
+from poke_team import PokeTeam
+from random_gen import RandomGen
+
+
+def league_of(kind, n, seed=1234):
+    """ Returns a league of n random teams. """
+    RandomGen.set_seed(seed)
+    league = kind()
+    league.generate_teams(n)
+    return league
+
+
+class TestGenerateTeams(unittest.TestCase):
+    """ Tests that generated teams are the ones random_team would have created. """
+
+    def test_codes(self):
+        league = league_of(RoundRobinLeague, 10, seed=99)
+        RandomGen.set_seed(99)
+        for idx in range(10):
+            mode = RandomGen.randint(0, 1)
+            self.assertEqual(league.team_codes[idx], PokeTeam.random_team(f"Team {idx}", mode).get_config_code())
+
+
+class TestRoundRobin(unittest.TestCase):
+    """ Tests that every pair of teams meets exactly once. """
+
+    def test_pairs(self):
+        for n in range(2, 14):
+            league = league_of(RoundRobinLeague, n)
+            seen = {}
+            for round_idx in range(league.num_rounds()):
+                playing = set()
+                for team1, team2 in league.pairings(round_idx):
+                    self.assertNotEqual(team1, team2)
+                    self.assertNotIn(team1, playing)
+                    self.assertNotIn(team2, playing)
+                    playing.update((team1, team2))
+                    key = (min(team1, team2), max(team1, team2))
+                    seen[key] = seen.get(key, 0) + 1
+                self.assertEqual(len(playing), n - n % 2)
+            self.assertEqual(len(seen), n * (n - 1) // 2)
+            self.assertTrue(all(count == 1 for count in seen.values()))
+
+    def test_standings(self):
+        league = league_of(RoundRobinLeague, 9)
+        standings = league.run(seed=5, max_workers=1)
+        self.assertEqual(sum(wins + draws + losses for _, _, wins, draws, losses in standings), 9 * 8)
+        for _, points, wins, draws, _ in standings:
+            self.assertEqual(points, WIN_POINTS * wins + DRAW_POINTS * draws)
+        self.assertEqual([row[1] for row in standings], sorted((row[1] for row in standings), reverse=True))
+
+
+class TestSwiss(unittest.TestCase):
+    """ Tests that teams are not paired again while they have someone new to play. """
+
+    def test_no_rematch(self):
+        league = league_of(SwissLeague, 16)
+        league.rounds = 5
+        pairs = set()
+        for round_idx in range(league.num_rounds()):
+            for team1, team2 in league.pairings(round_idx):
+                pair = (min(team1, team2), max(team1, team2))
+                self.assertNotIn(pair, pairs)
+                pairs.add(pair)
+        self.assertEqual(len(pairs), 5 * 8)
+
+
+class TestWorkers(unittest.TestCase):
+    """ Tests that results do not depend on the number of workers or the size of the chunks. """
+
+    def test_scheduler(self):
+        league = league_of(RoundRobinLeague, 10)
+        expected = None
+        for max_workers, chunk_size in ((1, 64), (2, 3), (3, 1)):
+            with PairingScheduler(77, max_workers, chunk_size) as scheduler:
+                results = sorted(scheduler.play(0, league.pairings(0), league.team_codes))
+            if expected is None:
+                expected = results
+            self.assertEqual(results, expected)
+
+    def test_leagues(self):
+        for kind in (RoundRobinLeague, SwissLeague):
+            expected = league_of(kind, 12).run(seed=3, max_workers=1)
+            self.assertEqual(league_of(kind, 12).run(seed=3, max_workers=2), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+""" Tests for the battle screen and the sprite atlas it draws from. """
+
+import io
+import os
+import tempfile
+import unittest
+from print_screen import GameScreen, POKEMON_COLORS
+from sprite_atlas import SpriteAtlas, build_atlas, SPRITE_DIR
+
+
+class TestSprites(unittest.TestCase):
+    """ Tests that the sprites in the repository draw a frame of every pokemon, with or without the atlas. """
+
+    def test_draw(self):
+        stream = io.StringIO()
+        screen = GameScreen(stream)
+        for name in POKEMON_COLORS:
+            screen.draw(name, name, 10, 20, 5, 20, 3, 4, "free", "burn", 2, 3)
+        self.assertTrue(stream.getvalue())
+
+    def test_atlas(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sprites.atlas")
+            self.assertEqual(build_atlas(SPRITE_DIR, path), 2 * len(POKEMON_COLORS))
+            atlas = SpriteAtlas.open(path)
+            for name in POKEMON_COLORS:
+                for sprite_name in (name, name + "_back"):
+                    with open(os.path.join(SPRITE_DIR, sprite_name + ".txt")) as f:
+                        self.assertEqual(atlas.get_rows(sprite_name), f.read().split("\n"))
+            atlas.data.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+""" Tests for EloRatings and GlickoRatings. """
+
+import math
+import unittest
+from ratings import EloRatings, GlickoRatings, RD_GROWTH, INITIAL_RATING
+
+
+class TestGlicko(unittest.TestCase):
+    """ Tests against the example of Glickman's paper and the growth of the deviation between periods. """
+
+    def test_example(self):
+        table = GlickoRatings(rd_growth=0)
+        for code, rating, deviation in ((1, 1500, 200), (2, 1400, 30), (3, 1550, 100), (4, 1700, 300)):
+            slot = table._slot(code)
+            table.ratings[slot] = rating
+            table.deviations[slot] = deviation
+        for opponent, battle_res in ((2, 1), (3, 2), (4, 2)):
+            table.add(1, opponent, battle_res)
+        table.end_period()
+        self.assertAlmostEqual(table.rating(1), 1464.1, places=1)
+        self.assertAlmostEqual(table.deviations[table.slots[1]], 151.4, places=1)
+
+    def test_growth(self):
+        table = GlickoRatings()
+        table.add(1, 2, 1)
+        table.end_period()
+        deviation = table.deviations[table.slots[1]]
+        self.assertAlmostEqual(table.deviation(1), math.sqrt(deviation ** 2 + RD_GROWTH ** 2))
+        table.end_period()
+        table.end_period()
+        self.assertAlmostEqual(table.deviation(1), math.sqrt(deviation ** 2 + 3 * RD_GROWTH ** 2))
+
+    def test_period_size(self):
+        table = GlickoRatings(period_size=4)
+        for _ in range(10):
+            table.add(1, 2, 1)
+        self.assertEqual(table.period, 2)
+        self.assertEqual(table.period_games, 2)
+        self.assertGreater(table.rating(1), INITIAL_RATING)
+        self.assertRaises(ValueError, GlickoRatings, period_size=0)
+
+
+class TestElo(unittest.TestCase):
+    """ Tests that Elo ratings move by k times the surprise of a result. """
+
+    def test_update(self):
+        table = EloRatings(k=32)
+        table.add(1, 2, 1)
+        self.assertAlmostEqual(table.rating(1), INITIAL_RATING + 16)
+        self.assertAlmostEqual(table.rating(2), INITIAL_RATING - 16)
+
+    def test_batched(self):
+        table = EloRatings(k=32, batched=True)
+        table.add_games([(1, 2, 1), (1, 2, 1), (1, 2, 0)], period_size=2)
+        self.assertAlmostEqual(table.rating(1), INITIAL_RATING + 32)
+        self.assertEqual(table.period_games, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
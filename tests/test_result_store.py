@@ -0,0 +1,26 @@
+""" Tests for ResultStore. """
+
+import unittest
+from poke_team import PokeTeam, Criterion
+from random_gen import RandomGen
+from result_store import ResultStore
+
+
+class TestResultStore(unittest.TestCase):
+    """ Tests that results are stored with the battle mode and criterion of both teams. """
+
+    def test_add(self):
+        RandomGen.set_seed(5)
+        code1 = PokeTeam.random_config(2, criterion=Criterion.DEF)
+        code2 = PokeTeam.random_config(1)
+        with ResultStore(":memory:", batch_size=2) as store:
+            store.add(code1, code2, 1, seed=7, turns=3, source="test")
+            store.add(code2, code1, 2)
+            rows = store.connection.execute("SELECT source, team1_code, mode1, mode2, criterion1, criterion2, seed, "
+                                            "result, turns FROM battles ORDER BY id").fetchall()
+        self.assertEqual(rows, [("test", code1, 2, 1, Criterion.DEF.value, 0, 7, 1, 3),
+                                (None, code2, 1, 2, 0, Criterion.DEF.value, None, 2, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
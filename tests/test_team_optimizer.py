@@ -0,0 +1,45 @@
+""" Tests for the opponents and the search of team_optimizer. """
+
+import unittest
+from poke_team import PokeTeam, Criterion
+from random_gen import RandomGen
+from team_optimizer import LEADERBOARD_SEED, all_configs, leaderboard_opponents, search_opponents, successive_halving
+
+
+class TestOpponents(unittest.TestCase):
+    """ Tests that the search plays its own opponents and leaves the random generator as it was. """
+
+    def test_leaderboard_opponents(self):
+        RandomGen.set_seed(11)
+        opponents = leaderboard_opponents(50)
+        self.assertEqual(RandomGen.seed, 11)
+        RandomGen.set_seed(LEADERBOARD_SEED)
+        PokeTeam.leaderboard_team()
+        teams = [PokeTeam.random_team(f"Team {x}", RandomGen.randint(0, 2),
+                                      criterion=Criterion(RandomGen.randint(1, len(Criterion)))) for x in range(50)]
+        self.assertEqual([team.get_config_code() for team in teams], opponents)
+
+    def test_search_opponents(self):
+        RandomGen.set_seed(11)
+        opponents = search_opponents(200)
+        self.assertEqual(RandomGen.seed, 11)
+        self.assertEqual(search_opponents(200), opponents)
+        self.assertEqual(search_opponents(50), opponents[:50])
+        self.assertNotEqual(search_opponents(200, seed=8), opponents)
+        self.assertNotEqual(opponents, leaderboard_opponents(200))
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+    """ Tests that the finalists have played every opponent and do not depend on the number of workers. """
+
+    def test_finalists(self):
+        configs = all_configs()[::400]
+        opponents = search_opponents(24)
+        finalists = successive_halving(configs, opponents, seed=2, max_workers=1)
+        self.assertTrue(all(played == len(opponents) for _, _, _, played in finalists))
+        self.assertEqual([row[1:3] for row in finalists], sorted((row[1:3] for row in finalists), reverse=True))
+        self.assertEqual(successive_halving(configs, opponents, seed=2, max_workers=2), finalists)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+""" Tests for Tournament, against the results of the tournament before it was played from a BracketPlan. """
+
+import os
+import tempfile
+import unittest
+from battle import Battle
+from random_gen import RandomGen
+from tournament import Tournament
+
+GYM_LEADERS = "Roark Gardenia + Maylene Crasher_Wake + Fantina Byron + + + Candice Volkner + +"
+EIGHT = "A B + C D + E F + G H + + + +"
+
+
+def bracket(lo, hi):
+    """ Returns a balanced tournament string of the teams T{lo} to T{hi - 1}. """
+    if hi - lo == 1:
+        return f"T{lo}"
+    mid = (lo + hi) // 2
+    return f"{bracket(lo, mid)} {bracket(mid, hi)} +"
+
+
+def games(lst):
+    """ Returns the items of a LinkedList of games as a list. """
+    return [lst[idx] for idx in range(len(lst))]
+
+
+def started(tournament_str, battle_mode, seed):
+    """ Returns a started tournament, with RandomGen seeded just before it was started. """
+    RandomGen.set_seed(seed)
+    tour = Tournament(Battle(verbosity=0))
+    tour.set_battle_mode(battle_mode)
+    tour.start_tournament(tournament_str)
+    return tour
+
+
+class TestBaseline(unittest.TestCase):
+    """ Tests that the games, metas and random numbers used are the same as before the BracketPlan. """
+    # (tournament, battle mode, games, teams with the types they have not seen, seed after the tournament), seed 1
+    BASELINE = [
+        (GYM_LEADERS, 0,
+         [('Gardenia', 'Volkner'), ('Candice', 'Volkner'), ('Gardenia', 'Maylene'), ('Maylene', 'Byron'),
+          ('Fantina', 'Byron'), ('Maylene', 'Crasher_Wake'), ('Roark', 'Gardenia')],
+         {2: ['FIRE']}, 154120189631536),
+        (GYM_LEADERS, 1,
+         [('Gardenia', 'Volkner'), ('Candice', 'Volkner'), ('Gardenia', 'Byron'), ('Maylene', 'Byron'),
+          ('Fantina', 'Byron'), ('Maylene', 'Crasher_Wake'), ('Roark', 'Gardenia')],
+         {}, 64125584189379),
+        (EIGHT, 0,
+         [('B', 'C'), ('C', 'H'), ('F', 'H'), ('G', 'H'), ('E', 'F'), ('C', 'D'), ('A', 'B')],
+         {0: ['FIRE'], 2: ['NORMAL']}, 161688768528616),
+        (EIGHT, 1,
+         [('B', 'C'), ('C', 'F'), ('F', 'H'), ('G', 'H'), ('E', 'F'), ('C', 'D'), ('A', 'B')],
+         {0: ['FIRE'], 2: ['NORMAL']}, 179397301542716),
+    ]
+
+    def test_games(self):
+        for tournament_str, battle_mode, expected, _, seed_after in self.BASELINE:
+            tour = started(tournament_str, battle_mode, 1)
+            self.assertEqual(games(tour.linked_list_of_games()), expected)
+            self.assertEqual(RandomGen.seed, seed_after)
+
+    def test_metas(self):
+        for tournament_str, battle_mode, expected, metas, seed_after in self.BASELINE:
+            tour = started(tournament_str, battle_mode, 1)
+            result = [(team1.get_team_name(), team2.get_team_name(), types)
+                      for team1, team2, types in games(tour.linked_list_with_metas())]
+            self.assertEqual(result, [(team1, team2, metas.get(idx, [])) for idx, (team1, team2) in enumerate(expected)])
+            self.assertEqual(RandomGen.seed, seed_after)
+
+    def test_mode_2(self):
+        tour = Tournament(Battle(verbosity=0))
+        tour.set_battle_mode(2)
+        self.assertRaises(ValueError, tour.start_tournament, EIGHT)
+
+
+class TestFlip(unittest.TestCase):
+    """ Tests that flipping a match replays the bracket above it and keeps only the teams still waiting. """
+
+    def test_champion(self):
+        tour = started(EIGHT, 0, 1)
+        lst = tour.linked_list_of_games()
+        champion = tour.winners[tour.plan.num_nodes() - 1]
+        self.assertEqual(list(tour.teams), [champion])
+        tour.flip_tournament(lst, *lst[0])
+        self.assertNotEqual(tour.winners[tour.plan.num_nodes() - 1], champion)
+        self.assertEqual(list(tour.teams), [])
+
+    def test_waiting(self):
+        tour = started(EIGHT, 0, 1)
+        name1, name2, battle_res = tour.advance_tournament()
+        tour.advance_tournament()
+        waiting = tour.winners[tour.plan.match_node(1)]
+        tour.flip_tournament([None] * tour.plan.num_matches, name1, name2)
+        self.assertEqual(list(tour.teams), [waiting])
+        parent = tour.plan.parent[tour.plan.match_node(0)]
+        while tour.match_idx <= parent - tour.plan.num_teams:
+            game = tour.advance_tournament()
+        self.assertIn(name2 if battle_res == 1 else name1, game[:2])
+
+    def test_not_played(self):
+        tour = started(EIGHT, 0, 1)
+        lst = tour.linked_list_of_games()
+        self.assertRaises(ValueError, tour.flip_tournament, lst, "A", "Z")
+        self.assertRaises(ValueError, tour.flip_tournament, lst, "Z", "A")
+        self.assertRaises(ValueError, tour.flip_tournament, lst, "A", "H")
+
+
+class TestCheckpoints(unittest.TestCase):
+    """ Tests that a resumed tournament plays the same as one that was never stopped. """
+
+    def setUp(self):
+        self.tournament_str = bracket(0, 64)
+        tour = started(self.tournament_str, 1, 7)
+        self.expected = games(tour.linked_list_of_games())
+        self.seed_after = RandomGen.seed
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "checkpoint.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume(self):
+        for stop_at in (0, 1, 30, 62):
+            tour = started(self.tournament_str, 1, 7)
+            for _ in range(stop_at):
+                tour.advance_tournament()
+            tour.save_checkpoint(self.path)
+            RandomGen.set_seed(0)
+            resumed = Tournament.resume(self.path, Battle(verbosity=0))
+            self.assertEqual(games(resumed.run_with_checkpoints(self.path, 10)), self.expected)
+            self.assertEqual(RandomGen.seed, self.seed_after)
+
+    def test_every(self):
+        tour = started(self.tournament_str, 1, 7)
+        for every in (0, -1, 1.5):
+            self.assertRaises(ValueError, tour.run_with_checkpoints, self.path, every)
+
+
+class TestParallel(unittest.TestCase):
+    """ Tests that the parallel tournament does not depend on the number of workers. """
+
+    def test_workers(self):
+        tournament_str = bracket(0, 16)
+        tour = started(tournament_str, 0, 3)
+        seed_before = RandomGen.seed
+        expected = games(tour.linked_list_of_games_parallel(11, max_workers=1))
+        self.assertEqual(RandomGen.seed, seed_before)
+        for max_workers in (2, 3):
+            tour = started(tournament_str, 0, 3)
+            self.assertEqual(games(tour.linked_list_of_games_parallel(11, max_workers=max_workers)), expected)
+        self.assertEqual(len(expected), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+""" Tests for BattleTower and BattleTowerIterator. """
+
+import unittest
+from battle import Battle
+from poke_team import PokeTeam
+from random_gen import RandomGen
+from tower import BattleTower, CompactRoster, LivesQueue, DUPLICATE_BITS, size_bit
+
+SEED = 29183712400123
+
+
+def new_tower(seed, n, compact=False):
+    """ Returns a tower of n random teams against a team of 6, with RandomGen seeded just before. """
+    RandomGen.set_seed(seed)
+    tower = BattleTower(Battle(verbosity=0))
+    tower.set_my_team(PokeTeam.random_team("Jackson", 0, team_size=6))
+    tower.generate_teams(n, compact=compact)
+    return tower
+
+
+def lives_count(tower):
+    """ Returns the lives count of a tower as a list. """
+    counts = tower.get_lives_count()
+    return [counts[idx] for idx in range(len(counts))]
+
+
+class TestBaseline(unittest.TestCase):
+    """ Tests that the battles and random numbers used are the same as before the tower was changed. """
+
+    def test_battles(self):
+        tower = new_tower(SEED, 10)
+        results = [(res, them.get_team_name(), lives) for res, me, them, lives in tower]
+        self.assertEqual(results, [(1, "Team 0", 5), (1, "Team 1", 4), (1, "Team 2", 7), (2, "Team 3", 10)])
+        self.assertEqual(RandomGen.seed, 92432120909681)
+
+    def test_avoid_duplicates(self):
+        tower = new_tower(SEED, 10)
+        it = iter(tower)
+        it.avoid_duplicates()
+        results = [(res, them.get_team_name(), lives) for res, me, them, lives in it]
+        self.assertEqual(results, [(1, "Team 2", 7), (1, "Team 9", 8), (2, "Team 2", 7)])
+        self.assertEqual(RandomGen.seed, 32159680047393)
+
+
+class TestCompactRoster(unittest.TestCase):
+    """ Tests that a CompactRoster plays exactly like a tower of PokeTeams. """
+
+    def play(self, seed, compact):
+        tower = new_tower(seed, 30, compact)
+        if compact:
+            self.assertIsInstance(tower.get_tower_team_lst(), CompactRoster)
+        it = iter(tower)
+        results = []
+        if seed % 2:
+            for _, (res, me, them, lives) in zip(range(3), it):
+                results.append((res, them.get_team_name(), lives))
+        it.sort_by_lives()
+        if seed % 3 == 0:
+            it.avoid_duplicates()
+        roster = tower.get_roster()
+        summary = it.run_to_completion()
+        return results, roster, summary, lives_count(tower), RandomGen.seed
+
+    def test_same_as_eager(self):
+        for seed in range(12):
+            self.assertEqual(self.play(seed, True), self.play(seed, False))
+
+    def filtered(self, seed, compact, sort, require, forbid):
+        tower = new_tower(seed, 30, compact)
+        it = iter(tower)
+        for _ in zip(range(seed % 4 * 5), it):
+            pass
+        if sort:
+            it.sort_by_lives()
+        it.filter_teams(require, forbid)
+        return tower.get_roster(), lives_count(tower), [(res, lives) for res, me, them, lives in it], RandomGen.seed
+
+    def test_filter_same_as_eager(self):
+        for seed in range(8):
+            for sort in (False, True):
+                for require, forbid in ((0, DUPLICATE_BITS), (1, 0), (2, size_bit(6)), (0, ~0)):
+                    self.assertEqual(self.filtered(seed, True, sort, require, forbid),
+                                     self.filtered(seed, False, sort, require, forbid))
+
+    def test_set_compact_roster(self):
+        tower = new_tower(SEED, 10)
+        roster = tower.get_roster()
+        tower.set_compact_roster(roster)
+        self.assertEqual(tower.get_roster(), roster)
+
+
+class TestSortByLives(unittest.TestCase):
+    """ Tests that the tower stays sorted by lives as the battles go on. """
+
+    def test_fewest_lives_first(self):
+        for seed in range(6):
+            tower = new_tower(seed, 40, compact=seed % 2 == 1)
+            tower.set_my_team(PokeTeam.random_team("Cynthia", 1, team_size=6))
+            it = iter(tower)
+            it.sort_by_lives()
+            self.assertIsInstance(tower.get_tower_team_lst(), LivesQueue)
+            roster = tower.get_roster()
+            self.assertEqual([lives for _, lives in roster], sorted(lives for _, lives in roster))
+            for res, me, them, lives in it:
+                fewest = min(lives for _, lives in roster)
+                self.assertEqual(lives + (1 if res == 1 else 0), fewest)
+                roster = tower.get_roster()
+                self.assertEqual([lives for _, lives in roster], sorted(lives for _, lives in roster))
+                self.assertEqual(len(roster), sum(lives_count(tower)))
+
+    def test_one_slot_per_team(self):
+        for compact in (False, True):
+            tower = new_tower(SEED, 25, compact)
+            it = iter(tower)
+            it.sort_by_lives()
+            queue = tower.get_tower_team_lst()
+            self.assertEqual(queue.capacity, 25)
+            self.assertEqual(len(queue.next_slot), 25)
+            self.assertEqual(len(queue), 25)
+            self.assertTrue(queue.is_full())
+            team = queue.serve()
+            self.assertEqual(len(queue), 24)
+            team.key = 1
+            queue.append(team)
+            self.assertEqual(queue.serve().key, 1)
+            queue.clear()
+            self.assertTrue(queue.is_empty())
+            self.assertEqual(tower.get_roster(), [])
+
+
+class TestRunToCompletion(unittest.TestCase):
+    """ Tests that run_to_completion plays the same battles as iterating the tower. """
+
+    def test_same_as_iterating(self):
+        for seed in range(8):
+            tower = new_tower(seed, 15)
+            team_lives = {f"Team {idx}": lives for idx, (_, lives) in enumerate(tower.get_roster())}
+            wins = dict.fromkeys(team_lives, 0)
+            battles = 0
+            defeated_at = None
+            for res, me, them, lives in tower:
+                team_lives[them.get_team_name()] = lives
+                if res == 1:
+                    wins[them.get_team_name()] += 1
+                else:
+                    defeated_at = battles
+                battles += 1
+            seed_after = RandomGen.seed
+
+            summary = new_tower(seed, 15).run_to_completion()
+            self.assertEqual(summary["battles"], battles)
+            self.assertEqual(summary["defeated_at"], defeated_at)
+            self.assertEqual(list(summary["team_ids"]), list(range(15)))
+            self.assertEqual(list(summary["lives"]), [team_lives[f"Team {idx}"] for idx in range(15)])
+            self.assertEqual(list(summary["wins"]), [wins[f"Team {idx}"] for idx in range(15)])
+            self.assertEqual(RandomGen.seed, seed_after)
+
+
+if __name__ == '__main__':
+    unittest.main()
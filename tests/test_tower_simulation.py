@@ -0,0 +1,39 @@
+""" Tests for clearance_probability. """
+
+import unittest
+from battle import Battle
+from poke_team import PokeTeam
+from random_gen import RandomGen
+from tower import BattleTower
+from tower_simulation import clearance_probability, simulate_tower
+
+
+class TestClearanceProbability(unittest.TestCase):
+    """ Tests that the estimate only depends on its arguments. """
+
+    def setUp(self):
+        RandomGen.set_seed(29183712400123)
+        tower = BattleTower(Battle(verbosity=0))
+        tower.generate_teams(6)
+        self.roster = tower.get_roster()
+        self.code = PokeTeam.random_team("Jackson", 0, team_size=6).get_config_code()
+
+    def test_workers(self):
+        seed_before = RandomGen.seed
+        expected = clearance_probability(self.code, self.roster, simulations=96, seed=4, max_workers=1,
+                                         batch_size=8, tolerance=0)
+        self.assertEqual(RandomGen.seed, seed_before)
+        for max_workers in (2, 3):
+            self.assertEqual(clearance_probability(self.code, self.roster, simulations=96, seed=4,
+                                                   max_workers=max_workers, batch_size=8, tolerance=0), expected)
+        self.assertEqual(expected["simulations"], 96)
+        self.assertEqual(expected["cleared"] + sum(expected["defeats"].values()), 96)
+
+    def test_towers(self):
+        summary = clearance_probability(self.code, self.roster, simulations=20, seed=4, max_workers=1, tolerance=0)
+        cleared = sum(simulate_tower(self.code, self.roster, RandomGen.derive_seed(4, idx)) == -1 for idx in range(20))
+        self.assertEqual(summary["cleared"], cleared)
+
+
+if __name__ == '__main__':
+    unittest.main()
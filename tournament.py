@@ -7,13 +7,17 @@ Teams will be split into even halves, and winner of each half plays against one
 __author__ = "Scaffold by Jackson Goerner, Code by Chai Wai Jin, Hang Jui Kai & Jeremy To Jun Wei"
 
 from poke_team import PokeTeam
-from battle import Battle
+from battle import Battle, battle_codes
 from linked_list import LinkedList
-from stack_adt import ArrayStack
-from queue_adt import CircularQueue
 from random_gen import RandomGen
-from bset import BSet
+from bracket_plan import BracketPlan, check_tournament
+from dashboard import BattleBoard
 from pokemon_base import PokeType
+import json
+from array import array
+import os
+from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 class Tournament:
     """ Implements a battle tower with random PokeTeams that have a certain amount of lives for the user to face off
@@ -33,10 +37,13 @@ class Tournament:
         else:
             self.battle = battle
         self.battle_mode = -1
-        self.tournament_queue = None
-        self.tournament_str_lst = None
-        self.tournament_stack = None
-        self.idx = 2
+        self.plan = None
+        self.teams = None
+        self.team_codes = None
+        self.winners = None
+        self.results = None
+        self.subtree_types = None
+        self.match_idx = 0
 
     def get_battle_mode(self) -> int:
         """ To get the battle mode of PokeTeam
@@ -63,32 +70,27 @@ class Tournament:
             :pre: the string must contain at least two team name and a "+" symbol
             :post: the string should not be modified
             :param arg1: a string represent the tournaments
-            :complexity: Best O(n) when tournament_str is invalid  eg. starts with a "+", Worst O(n+m) when the
-                         tournament_str is valid, where n is len(tournament_str), and m is the length of the list after
-                         tournament_str.split(" ").
-
-            The function returns True if the tournament_str passed represents a valid tournament.
-        """
-        tournament_lst = tournament_str.split(" ")
-        tournament_stack = ArrayStack(len(tournament_lst))
-        for elem in tournament_lst:
-            if elem != "+": 
-                tournament_stack.push(elem)
-            else:
-                try:
-                    team2 = tournament_stack.pop()
-                    team1 = tournament_stack.pop()
-                except Exception as e:
-                    return False  # O(1)
-                else:
-                    battle_str = f"({team1} + {team2})"
-                    tournament_stack.push(battle_str)
-
-        return True
+            :complexity: Best O(k) when the k'th token is invalid eg. starts with a "+", Worst O(n) when the
+                         tournament_str is valid, where n is len(tournament_str).
+
+            The function returns True if the tournament_str passed represents a valid tournament, which is when every
+            "+" has two brackets to combine and a single winner is left at the end.
+        """
+        return check_tournament(tournament_str)[0]
 
     def is_balanced_tournament(self, tournament_str: str) -> bool:
-        # 1054 only
-        raise NotImplementedError()
+        """ To verify the tournament is balanced.
+
+            :post: the string should not be modified
+            :param arg1: a string represent the tournaments
+            :complexity: Best O(k) when the k'th token is invalid, Worst O(n) when the tournament_str is valid, where n
+                         is len(tournament_str).
+
+            The function returns True if the tournament_str is valid and every match is played between two brackets
+            with the same number of teams.
+        """
+        is_valid, is_balanced, _ = check_tournament(tournament_str)
+        return is_valid and is_balanced
 
     def start_tournament(self, tournament_str: str) -> None:
         """ To generate the PokeTeam.
@@ -97,58 +99,104 @@ class Tournament:
             :pre: the string must contain at least two team name and a "+" symbol
             :post: the string should not be modified
             :param arg1: a string represent the tournaments
-            :complexity: Best/Worst O((n*r)+m), where n is the length of the list of tournament_str.split(" "), r is the
-                         complexity of PokeTeam.random_team() method, and m is len(self.tournament_queue)
-        
-        """
-        if not self.is_valid_tournament(tournament_str):
-            raise ValueError("Tournament is not valid")
-
-        self.tournament_str_lst = tournament_str.split(" ")
-        self.tournament_queue = CircularQueue(len(self.tournament_str_lst))
-        for idx in range(len(self.tournament_str_lst)):
-            if self.tournament_str_lst[idx] != "+":
-                self.tournament_queue.append(self.tournament_str_lst[idx])
+            :complexity: Best O(n) when the same tournament_str was started before and its plan is reused, Worst
+                         O(n+m) otherwise, where n is the number of teams and m is len(tournament_str)
 
-        for _ in range(len(self.tournament_queue)):
-            team = PokeTeam.random_team(self.tournament_queue.serve(), self.get_battle_mode())
-            self.tournament_queue.append(team)
-
-        self.tournament_stack = ArrayStack(len(self.tournament_queue))
+            Only the configuration code of every team is drawn here, with the same random numbers as
+            PokeTeam.random_team(). A team's PokeTeam is created just before its first match and dropped as soon as
+            it loses, so only the teams waiting for their next match, at most the depth of the bracket, are kept.
+            What is kept for the whole field are typed arrays of a few bytes per team and match, see _reset_records.
+        """
+        if self.plan is None or self.plan.tournament_str != tournament_str:
+            self.plan = BracketPlan(tournament_str)
+
+        self.team_codes = array("I", bytes(4 * self.plan.num_teams))
+        for idx in range(self.plan.num_teams):
+            self.team_codes[idx] = PokeTeam.random_config(self.get_battle_mode())
+        self._reset_records()
+
+    def _reset_records(self) -> None:
+        """ Clears the match records and created teams, and builds the type bitmasks of every bracket from the codes.
+            :complexity: Best/Worst O(n), where n is the number of teams
+
+            The created teams are kept in a dictionary by team index, which only ever holds the teams still waiting
+            for a match. The records of the whole bracket, needed to resume, flip or list the tournament, are typed
+            arrays: the winner of every bracket (4 bytes), its type bitmask (1 byte) and the result of every match
+            (1 byte), on top of the 4 byte configuration code of every team.
+        """
+        num_nodes = self.plan.num_nodes()
+        self.teams = {}
+        self.winners = array("i", bytes(4 * num_nodes))
+        self.subtree_types = array("B", bytes(num_nodes))
+        for idx in range(self.plan.num_teams):
+            self.winners[idx] = idx
+            self.subtree_types[idx] = PokeTeam.config_type_mask(self.team_codes[idx])
+        for idx in range(self.plan.num_teams, self.plan.num_nodes()):
+            self.subtree_types[idx] = self.subtree_types[self.plan.left[idx]] | self.subtree_types[self.plan.right[idx]]
+        self.results = array("B", bytes(max(1, self.plan.num_matches)))
+        self.match_idx = 0
 
     def advance_tournament(self) -> tuple[PokeTeam, PokeTeam, int] | None:
         """ To simulate the battle of tournament.
 
-            :complexity: Best/Worst O(T+B), where T is the number of tournament battles, and B is the time complexity
-                        of running a battle.
+            :complexity: Best/Worst O(B), where B is the time complexity of running a battle.
             
             The function simulates one battle of the tournament, None will be returned if no games are remaining,
             otherwise, it follows the order of the previously given tournament string.
         """
-        while self.idx < len(self.tournament_str_lst) and self.tournament_str_lst[self.idx] != "+":
-            self.idx += 1
-
-        if self.idx >= len(self.tournament_str_lst):
+        if self.match_idx >= self.plan.num_matches:
             return None
 
-        if self.tournament_str_lst[self.idx] == "+" and self.tournament_str_lst[self.idx-1] != "+":
-            team1 = self.tournament_queue.serve()
-            team2 = self.tournament_queue.serve()
-        elif self.tournament_str_lst[self.idx] == "+" and self.tournament_str_lst[self.idx-1] == "+":
-            team2 = self.tournament_stack.pop()
-            team1 = self.tournament_stack.pop()
+        team1, team2, battle_res = self._play_match(self.match_idx)
+        self.match_idx += 1
+        return (team1.get_team_name(), team2.get_team_name(), battle_res)
+
+    def _play_match(self, match_idx: int) -> tuple[PokeTeam, PokeTeam, int]:
+        """ Plays one match of the compiled bracket.
+
+            :param arg1: the index of the match in the plan
+            :complexity: Best/Worst O(B), where B is the time complexity of running a battle.
+
+            The participants are the recorded winners of the two brackets below the match, and the winner is
+            regenerated before its next match while the loser is dropped.
+        """
+        node = self.plan.match_node(match_idx)
+        idx1 = self.winners[self.plan.left[node]]
+        idx2 = self.winners[self.plan.right[node]]
+        team1 = self._team(idx1)
+        team2 = self._team(idx2)
 
         battle_res = self.battle.battle(team1, team2)
+        self._record_result(match_idx, battle_res)
         if battle_res == 1:
             team1.regenerate_team()
-            self.tournament_stack.push(team1)
+            del self.teams[idx2]
         else:
             team2.regenerate_team()
-            self.tournament_stack.push(team2)
+            del self.teams[idx1]
+        return team1, team2, battle_res
+
+    def _team(self, idx: int) -> PokeTeam:
+        """ Returns the PokeTeam of a team, creating it from its configuration code before its first match.
+            :complexity: Best O(1) when it already exists, Worst O(r), where r is the complexity of creating a PokeTeam
+        """
+        if idx not in self.teams:
+            self.teams[idx] = PokeTeam.from_config_code(self.plan.team_names[idx], self.team_codes[idx])
+        return self.teams[idx]
 
-        res = (team1.get_team_name(), team2.get_team_name(), battle_res)
-        self.idx += 1
-        return res
+    def _record_result(self, match_idx: int, battle_res: int) -> None:
+        """ Stores the result of a match and which team goes through.
+
+            :param arg1: the index of the match in the plan
+            :param arg2: the result of the battle
+            :complexity: Best/Worst O(1)
+        """
+        node = self.plan.match_node(match_idx)
+        self.results[match_idx] = battle_res
+        if battle_res == 1:
+            self.winners[node] = self.winners[self.plan.left[node]]
+        else:
+            self.winners[node] = self.winners[self.plan.right[node]]
 
     def linked_list_of_games(self) -> LinkedList[tuple[PokeTeam, PokeTeam]]:
         l = LinkedList()
@@ -158,74 +206,281 @@ class Tournament:
                 break
             l.insert(0, (res[0], res[1]))
         return l
+
+    def run_with_checkpoints(self, path: str, every: int = 100) -> LinkedList[tuple[PokeTeam, PokeTeam]]:
+        """ To simulate the rest of the tournament, saving a checkpoint as it goes.
+
+            :param arg1: path of the checkpoint file
+            :param arg2: number of matches between checkpoints, at least 1
+            :raise ValueError: if every is less than 1
+            :complexity: Best/Worst O(M*(B+n/every)), where M is the number of matches left to play, B is the time
+                         complexity of running a battle and n is the number of teams.
+
+            The function returns the linked list of every game of the tournament, including the ones played before a
+            resume, in the same layout as linked_list_of_games.
+        """
+        if not isinstance(every, int) or every < 1:
+            raise ValueError("Checkpoints need at least 1 match between them")
+        while self.advance_tournament() is not None:
+            if self.match_idx % every == 0:
+                self.save_checkpoint(path)
+        self.save_checkpoint(path)
+        return self._games_from_records()
+
+    def save_checkpoint(self, path: str) -> None:
+        """ To save the progress of the tournament.
+
+            :param arg1: path of the checkpoint file
+            :complexity: Best/Worst O(n+m), where n is the number of teams and m is len(tournament_str)
+
+            Only the configuration codes, the results so far and the random generator state are kept, as every team
+            that is still in the tournament is a freshly regenerated one. The file is replaced atomically, so a crash
+            while saving leaves the previous checkpoint intact.
+        """
+        checkpoint = {
+            "tournament": self.plan.tournament_str,
+            "battle_mode": self.battle_mode,
+            "team_codes": [self.team_codes[idx] for idx in range(self.plan.num_teams)],
+            "results": "".join(str(self.results[idx]) for idx in range(self.match_idx)),
+            "seed": RandomGen.seed,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def resume(cls, path: str, battle: Battle|None=None) -> Tournament:
+        """ To continue a tournament from a checkpoint.
+
+            :param arg1: path of the checkpoint file
+            :param arg2: battle logic described in the background
+            :complexity: Best/Worst O(n+m), where n is the number of teams and m is len(tournament_str)
+
+            The returned tournament continues exactly where the checkpoint was taken, so playing it out gives the
+            same results as a run that was never interrupted.
+        """
+        with open(path) as f:
+            checkpoint = json.load(f)
+
+        tournament = cls(battle)
+        tournament.set_battle_mode(checkpoint["battle_mode"])
+        tournament.plan = BracketPlan(checkpoint["tournament"])
+        tournament.team_codes = array("I", checkpoint["team_codes"])
+        tournament._reset_records()
+        for match_idx in range(len(checkpoint["results"])):
+            tournament._record_result(match_idx, int(checkpoint["results"][match_idx]))
+        tournament.match_idx = len(checkpoint["results"])
+        RandomGen.set_seed(checkpoint["seed"])
+        return tournament
+
+    def _games_from_records(self) -> LinkedList[tuple[PokeTeam, PokeTeam]]:
+        """ Builds the linked list of the games played so far from the recorded results.
+            :complexity: Best/Worst O(M), where M is the number of matches played
+        """
+        l = LinkedList()
+        for match_idx in range(self.match_idx):
+            node = self.plan.match_node(match_idx)
+            l.insert(0, (self.plan.team_names[self.winners[self.plan.left[node]]],
+                         self.plan.team_names[self.winners[self.plan.right[node]]]))
+        return l
+
+    def linked_list_of_games_parallel(self, seed: int, max_workers: int|None=None,
+                                      board: BattleBoard|None=None) -> LinkedList[tuple[PokeTeam, PokeTeam]]:
+        """ To simulate the whole tournament with independent brackets played at the same time.
+
+            :pre: the tournament has been started and no match has been played yet
+            :param arg1: base seed that every match seed is derived from
+            :param arg2: number of worker processes, 1 plays every match in this process
+            :param arg3: a BattleBoard to show the match every worker is playing on, see battle_codes
+            :complexity: Best/Worst O(M*B) work, where M is the total number of matches played and B is the time
+                         complexity of running a battle, spread over the workers so the wall time follows the depth
+                         of the bracket rather than M.
+
+            A match is sent to the process pool as soon as both of its participants are known. Each match reseeds
+            RandomGen with RandomGen.derive_seed(seed, match_idx), so the results only depend on the seed and never on
+            the order the workers finish in. The returned list has the same layout as linked_list_of_games, but the
+            results differ from it since that one draws every match from a single random stream.
+        """
+        if self.match_idx != 0:
+            raise ValueError("Tournament has already been advanced")
+
+        plan = self.plan
+        winners = self.winners
+        for idx in range(plan.num_teams, plan.num_nodes()):
+            winners[idx] = -1
+
+        def match_args(match_idx):
+            node = plan.match_node(match_idx)
+            team1 = winners[plan.left[node]]
+            team2 = winners[plan.right[node]]
+            return self.team_codes[team1], self.team_codes[team2], RandomGen.derive_seed(seed, match_idx), target
+
+        target = board if board is None or max_workers == 1 else board.channel()
+        if max_workers == 1:
+            saved_seed = RandomGen.seed
+            for match_idx in range(plan.num_matches):
+                self._record_result(match_idx, battle_codes(*match_args(match_idx)))
+            RandomGen.seed = saved_seed
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                running = {}
+                for match_idx in range(plan.num_matches):
+                    node = plan.match_node(match_idx)
+                    if plan.is_team(plan.left[node]) and plan.is_team(plan.right[node]):
+                        running[pool.submit(battle_codes, *match_args(match_idx))] = match_idx
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        match_idx = running.pop(future)
+                        self._record_result(match_idx, future.result())
+                        parent = plan.parent[plan.match_node(match_idx)]
+                        if parent != -1 and winners[plan.left[parent]] != -1 and winners[plan.right[parent]] != -1:
+                            parent_idx = parent - plan.num_teams
+                            running[pool.submit(battle_codes, *match_args(parent_idx))] = parent_idx
+
+        self.match_idx = plan.num_matches
+        l = LinkedList()
+        for match_idx in range(plan.num_matches):
+            node = plan.match_node(match_idx)
+            l.insert(0, (plan.team_names[winners[plan.left[node]]], plan.team_names[winners[plan.right[node]]]))
+        return l
     
     def linked_list_with_metas(self) -> LinkedList[tuple[PokeTeam, PokeTeam, list[str]]]:
         """ To analyse the pokemon types.
         
-            :complexity: Best/Worst O(M*(B+P)), where M is the total number of matches played, B is the time
-                         complexity of running a battle, and P is the limit on the number of pokemon per team.
+            :complexity: Best/Worst O(M*B), where M is the total number of matches played and B is the time
+                         complexity of running a battle, the types are compared as bitmasks in O(1).
             
             The function returns a linked containing two PokeTeam and the types of pokemon
             which are not present in the current match's team, but are present in some of 
             the teams defeated by these players.
         """
         ret_lst = LinkedList()
-        type_stack = ArrayStack(len(self.tournament_queue))
-        for idx in range(len(self.tournament_str_lst)):
-            if self.tournament_str_lst[idx] != "+":
-                continue
-
-            if self.tournament_str_lst[idx] == "+" and self.tournament_str_lst[idx - 1] != "+":
-                team1 = self.tournament_queue.serve()
-                team2 = self.tournament_queue.serve()
-            elif self.tournament_str_lst[idx] == "+" and self.tournament_str_lst[idx - 1] == "+":
-                team2 = self.tournament_stack.pop()
-                team1 = self.tournament_stack.pop()
-                previous_type = type_stack.pop()
-
-            type_set1 = self._create_type_set(team1)
-            type_set2 = self._create_type_set(team2)
-
-            union_set = type_set1.union(type_set2)
-            type_stack.push(union_set)
-
-            battle_res = self.battle.battle(team1, team2)
-            if battle_res == 1:
-                team1.regenerate_team()
-                self.tournament_stack.push(team1)
-            else:
-                team2.regenerate_team()
-                self.tournament_stack.push(team2)
+        for team1, team2, battle_res, ret_type_lst in self._games_with_metas():
+            ret_lst.insert(0, (team1, team2, ret_type_lst))
+        return ret_lst
+
+    def iter_games(self) -> Iterator[tuple[str, str, int, tuple[str, ...]]]:
+        """ To stream the results of the tournament.
+
+            :pre: the tournament has been started and no match has been played yet
+            :complexity: Best/Worst O(M*B) over the whole iteration, where M is the total number of matches played
+                         and B is the time complexity of running a battle. Memory held between matches is O(D), where D
+                         is the depth of the bracket.
+
+            The function yields (team1 name, team2 name, battle result, type names) as soon as each match is played,
+            where the type names are the same as the ones given by linked_list_with_metas. No PokeTeam is kept in the
+            records, so they can be written out while later matches are still being played.
+        """
+        for team1, team2, battle_res, ret_type_lst in self._games_with_metas():
+            yield team1.get_team_name(), team2.get_team_name(), battle_res, tuple(ret_type_lst)
+
+    def _games_with_metas(self) -> Iterator[tuple[PokeTeam, PokeTeam, int, list[str]]]:
+        """ Plays the remaining matches, pairing each with its type analysis.
+
+            :complexity: Best/Worst O(M*B), where M is the total number of matches played and B is the time
+                         complexity of running a battle.
+
+            The types of a match are compared against the types of the match its second team came through, both read
+            from the type bitmasks of the teams.
+        """
+        while self.match_idx < self.plan.num_matches:
+            node = self.plan.match_node(self.match_idx)
+            team1, team2, battle_res = self._play_match(self.match_idx)
+            self.match_idx += 1
 
             ret_type_lst = []
-            if self.tournament_str_lst[idx] == "+" and self.tournament_str_lst[idx - 1] == "+":
-                type_res = previous_type.difference(union_set)
-                for i in range(1, 6):
-                    if i in type_res:
-                        ret_type_lst.append(PokeType(i-1).name)
+            right = self.plan.right[node]
+            if not self.plan.is_team(right):
+                ret_type_lst = self._type_names(self._match_types(right) & ~self._match_types(node))
 
-            ret_tuple = (team1, team2, ret_type_lst)
-            ret_lst.insert(0, ret_tuple)
+            yield team1, team2, battle_res, ret_type_lst
 
-        return ret_lst
+    def unseen_types(self, match_idx: int) -> list[str]:
+        """ To find the types that were knocked out before a match.
 
-    def _create_type_set(self, team: PokeTeam) -> BSet:
-        """ Creates a set that contains the Pokemon Types of a team in terms of numbers.
+            :pre: the match has been played
+            :param arg1: the index of the match, in the order the matches are played
+            :complexity: Best/Worst O(1)
 
-        :param arg: a Pokemon Team.
-        :complexity: Best/Worst O(P), where P is the limit on the number of pokemon per team
+            The function returns the types of pokemon in any team of the brackets that lead to the match, but in
+            neither of the two teams that play it.
+        """
+        node = self.plan.match_node(match_idx)
+        return self._type_names(self.subtree_types[node] & ~self._match_types(node))
 
-        The function returns a set that contains the Pokemon Types of a team in terms of numbers.
+    def _match_types(self, node: int) -> int:
+        """ Returns the type bitmask of the two teams that played the match at the node.
+            :complexity: Best/Worst O(1)
         """
-        type_set = BSet()
-        for idx1 in range(len(team.get_team_numbers())):
-            if team.get_team_numbers()[idx1] > 0:
-                type_set.add(idx1 + 1)
-        return type_set
+        team1 = self.winners[self.plan.left[node]]
+        team2 = self.winners[self.plan.right[node]]
+        return self.subtree_types[team1] | self.subtree_types[team2]
 
-    def flip_tournament(self, tournament_list: LinkedList[tuple[PokeTeam, PokeTeam]], team1: PokeTeam, team2: PokeTeam) -> None:
-        # 1054
-        raise NotImplementedError()
+    def _type_names(self, type_mask: int) -> list[str]:
+        """ Returns the names of the types in a type bitmask.
+            :complexity: Best/Worst O(1), there are only 5 types
+        """
+        type_lst = []
+        for idx in range(5):
+            if (type_mask >> idx) & 1:
+                type_lst.append(PokeType(idx).name)
+        return type_lst
+
+    def flip_tournament(self, tournament_list: LinkedList[tuple[PokeTeam, PokeTeam]], team1: PokeTeam | str, team2: PokeTeam | str) -> None:
+        """ To flip the result of a match and replay only the matches it affects.
+
+            :pre: tournament_list was returned by linked_list_of_games of this tournament
+            :raises ValueError: if team1 and team2 did not play each other
+            :param arg1: the linked list of games of the tournament
+            :param arg2: a team in the match to flip, or its name
+            :param arg3: the other team in the match to flip, or its name
+            :complexity: Best O(D) when the flipped match is the final, Worst O(D*B), where D is the depth of the
+                         bracket and B is the time complexity of running a battle.
+
+            The other team goes through instead, and every later match on the way to the final is played again with
+            the new participant, stopping early once a replayed match has the same winner as before. The entries of
+            tournament_list for these matches are updated in place. When the last replayed match has a new winner,
+            the old one, which was waiting for its next match or is the champion, is dropped from the created teams.
+        """
+        name1 = team1.get_team_name() if isinstance(team1, PokeTeam) else team1
+        name2 = team2.get_team_name() if isinstance(team2, PokeTeam) else team2
+
+        node = self.plan.team_nodes.get(name1, -1)
+        while node != -1:
+            node = self.plan.parent[node]
+            if node != -1 and self.match_idx > node - self.plan.num_teams:
+                left_name = self.plan.team_names[self.winners[self.plan.left[node]]]
+                right_name = self.plan.team_names[self.winners[self.plan.right[node]]]
+                if (left_name, right_name) in ((name1, name2), (name2, name1)):
+                    break
+        if node == -1:
+            raise ValueError(f"{name1} and {name2} did not play each other")
+
+        match_idx = node - self.plan.num_teams
+        previous_winner = self.winners[node]
+        self._record_result(match_idx, 2 if self.results[match_idx] == 1 else 1)
+
+        node = self.plan.parent[node]
+        while node != -1 and self.match_idx > node - self.plan.num_teams:
+            match_idx = node - self.plan.num_teams
+            winner = self.winners[node]
+            left = self.winners[self.plan.left[node]]
+            right = self.winners[self.plan.right[node]]
+            battle_res = self.battle.battle(PokeTeam.from_config_code(self.plan.team_names[left], self.team_codes[left]),
+                                            PokeTeam.from_config_code(self.plan.team_names[right], self.team_codes[right]))
+            self._record_result(match_idx, battle_res)
+            tournament_list[self.plan.num_matches - 1 - match_idx] = (self.plan.team_names[left],
+                                                                     self.plan.team_names[right])
+            if self.winners[node] == winner:
+                return
+            previous_winner = winner
+            node = self.plan.parent[node]
+        # the old winner was waiting for the next match or is the champion, the new one is created when needed
+        self.teams.pop(previous_winner, None)
 
 
 if __name__ == "__main__":
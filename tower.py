@@ -13,7 +13,412 @@ from battle import Battle
 from random_gen import RandomGen
 from linked_list import *
 from sorted_list import ListItem
-from queue_adt import CircularQueue
+from queue_adt import CircularQueue, Queue
+from referential_array import ArrayR
+from array import array
+
+MIN_LIVES = 2
+MAX_LIVES = 10
+
+# composition bitmask of a team: bit t if it has type t, bit 5+t if it has more than one of type t, and bit 10+s
+# for its team size s
+TYPE_BITS = 0b11111
+DUPLICATE_BITS = 0b11111 << 5
+SIZE_SHIFT = 10
+
+def composition_mask(code: int) -> int:
+    """ Returns the composition bitmask of a team configuration code
+
+        :param args: a configuration code, see PokeTeam.encode_config
+        :complexity: Best/Worst O(1), there are only 5 types
+    """
+    team_numbers = PokeTeam.decode_config(code)[0]
+    mask = PokeTeam.config_type_mask(code)
+    for idx in range(len(team_numbers)):
+        if team_numbers[idx] > 1:
+            mask |= 1 << (5 + idx)
+    return mask | (1 << (SIZE_SHIFT + sum(team_numbers)))
+
+def size_bit(team_size: int) -> int:
+    """ Returns the composition bit of a team size
+        :complexity: Best/Worst O(1)
+    """
+    return 1 << (SIZE_SHIFT + team_size)
+
+class TowerTeam(ListItem):
+    """ A team in the tower with its lives as the key, its composition bitmask and its index in the tower. """
+
+    def __init__(self, value: PokeTeam, key: int, mask: int, team_id: int | None = None) -> None:
+        ListItem.__init__(self, value, key)
+        self.mask = mask
+        self.team_id = team_id
+
+class RosterSlot(TowerTeam):
+    """ A team served from a CompactRoster, which only creates its PokeTeam when value is first used.
+
+        Attributes:
+            team_id (int): index of the team in the tower, its name is "Team {team_id}"
+            code (int): configuration code of the team, see PokeTeam.encode_config
+            key (int): lives of the team
+            mask (int): composition bitmask of the team
+    """
+
+    def __init__(self, team_id: int, code: int, key: int, mask: int) -> None:
+        self.team_id = team_id
+        self.code = code
+        self.key = key
+        self.mask = mask
+        self._team = None
+
+    @property
+    def value(self) -> PokeTeam:
+        """ Returns the PokeTeam, creating it the first time
+            :complexity: Best O(1) once created, Worst O(r), where r is the complexity of creating a PokeTeam
+        """
+        if self._team is None:
+            self._team = PokeTeam.from_config_code(f"Team {self.team_id}", self.code)
+        return self._team
+
+class CompactRoster(Queue[RosterSlot]):
+    """ Circular queue of tower teams kept as typed arrays of (id, configuration code, lives, composition mask)
+
+        Attributes:
+            length (int): number of teams in the queue (inherited)
+            front (int): index of the team at the front of the queue
+            rear (int): index of the first empty space at the back of the queue
+            ids, codes, lives, masks (array): one entry per team
+
+        A team takes a few bytes instead of a whole PokeTeam, so the memory of a tower with millions of teams is only
+        these arrays. Serving a team returns a RosterSlot, which creates its PokeTeam only when it is about to battle,
+        and appending it back stores its numbers again so the PokeTeam can be released.
+    """
+
+    def __init__(self, max_capacity: int) -> None:
+        """ Initialisation
+            :complexity: Best/Worst O(n), where n is max_capacity
+        """
+        Queue.__init__(self)
+        self.front = 0
+        self.rear = 0
+        capacity = max(1, max_capacity)
+        self.ids = array("I", bytes(4 * capacity))
+        self.codes = array("I", bytes(4 * capacity))
+        self.lives = array("B", bytes(capacity))
+        self.masks = array("I", bytes(4 * capacity))
+
+    def append_team(self, team_id: int, code: int, lives: int, mask: int) -> None:
+        """ Adds a team to the rear of the queue from its numbers.
+
+            :raises Exception: if the queue is full
+            :complexity: Best/Worst O(1)
+        """
+        if self.is_full():
+            raise Exception("Queue is full")
+        self.ids[self.rear] = team_id
+        self.codes[self.rear] = code
+        self.lives[self.rear] = lives
+        self.masks[self.rear] = mask
+        self.length += 1
+        self.rear = (self.rear + 1) % len(self.ids)
+
+    def append(self, item: RosterSlot) -> None:
+        """ Adds a team served from this queue back to its rear, dropping its PokeTeam.
+
+            :raises Exception: if the queue is full
+            :complexity: Best/Worst O(1)
+        """
+        self.append_team(item.team_id, item.code, item.key, item.mask)
+
+    def serve(self) -> RosterSlot:
+        """ Deletes and returns the team at the queue's front.
+
+            :raises Exception: if the queue is empty
+            :complexity: Best/Worst O(1), the PokeTeam is only created when the slot's value is used
+        """
+        if self.is_empty():
+            raise Exception("Queue is empty")
+        idx = self.front
+        self.length -= 1
+        self.front = (self.front + 1) % len(self.ids)
+        return RosterSlot(self.ids[idx], self.codes[idx], self.lives[idx], self.masks[idx])
+
+    def is_full(self) -> bool:
+        """ True if the queue is full and no team can be appended. """
+        return len(self) == len(self.ids)
+
+    def keep_masks(self, require: int, forbid: int) -> list[int]:
+        """ Keeps only the teams whose composition bitmask has all the require bits and none of the forbid bits
+
+            :param arg1: composition bits a team must all have
+            :param arg2: composition bits a team must not have any of
+            :complexity: Best/Worst O(n), where n is the number of teams in the queue
+
+            The kept teams stay in order and are moved to the start of the arrays, without creating any RosterSlot.
+            The function returns the lives of the teams removed.
+        """
+        capacity = len(self.ids)
+        kept = []
+        removed = []
+        for pos in range(self.front, self.front + self.length):
+            idx = pos % capacity
+            mask = self.masks[idx]
+            if mask & require == require and mask & forbid == 0:
+                kept.append(idx)
+            else:
+                removed.append(self.lives[idx])
+        count = len(kept)
+        self.ids[:count] = array("I", [self.ids[idx] for idx in kept])
+        self.codes[:count] = array("I", [self.codes[idx] for idx in kept])
+        self.lives[:count] = array("B", [self.lives[idx] for idx in kept])
+        self.masks[:count] = array("I", [self.masks[idx] for idx in kept])
+        self.length = count
+        self.front = 0
+        self.rear = count % capacity
+        return removed
+
+    def clear(self) -> None:
+        """ Clears all teams from the queue. """
+        Queue.__init__(self)
+        self.front = 0
+        self.rear = 0
+
+class LivesQueue(Queue[TowerTeam]):
+    """ Tower teams kept in one linked queue per number of lives, served fewest lives first
+
+        Attributes:
+            length (int): number of teams in the queue (inherited)
+            compact (bool): the teams are kept as numbers, like in a CompactRoster, instead of as TowerTeams
+            teams (ArrayR[TowerTeam]): the team in each slot, when the queue is not compact
+            ids, codes, lives, masks (array): the numbers of the team in each slot, when the queue is compact
+            next_slot (array): the slot after each one in its bucket or in the free slots, -1 after the last one
+            heads, tails, sizes (array): first slot, last slot and number of teams of the bucket of each number of lives
+            free (int): first free slot, -1 if there is none
+            lowest (int): no bucket below this one has a team
+            capacity (int): number of slots, one per team the queue was made for
+
+        Lives only go down, so a team that loses a life is appended to the back of the bucket below, and the queue
+        stays sorted by lives without sorting it again. Teams with the same lives are served in the order they were
+        appended. The buckets are linked lists through one set of slots, and a served team gives its slot back, so
+        the queue never takes more than one slot per team whatever the lives are. Serving and appending a team back
+        puts it behind the other teams of its bucket, so the teams of a LivesQueue are visited bucket by bucket, see
+        queues.
+    """
+
+    def __init__(self, lives_count: ArrayR[int], compact: bool = False) -> None:
+        """ Initialisation
+
+            :param arg1: how many teams have each number of lives, see BattleTower.get_lives_count
+            :param arg2: keep the teams as numbers, like a CompactRoster, instead of TowerTeams
+            :complexity: Best/Worst O(L+n), where L is len(lives_count) and n is the number of teams
+        """
+        Queue.__init__(self)
+        self.compact = compact
+        self.capacity = 0
+        for lives in range(1, len(lives_count)):
+            self.capacity += lives_count[lives]
+        size = max(1, self.capacity)
+        if compact:
+            self.ids = array("I", bytes(4 * size))
+            self.codes = array("I", bytes(4 * size))
+            self.lives = array("B", bytes(size))
+            self.masks = array("I", bytes(4 * size))
+        else:
+            self.teams = ArrayR(size)
+        self.next_slot = array("i", range(1, size + 1))
+        self.next_slot[size - 1] = -1
+        self.free = 0
+        self.heads = array("i", [-1]) * len(lives_count)
+        self.tails = array("i", [-1]) * len(lives_count)
+        self.sizes = array("I", bytes(4 * len(lives_count)))
+        self.lowest = 0
+
+    def append(self, item: TowerTeam) -> None:
+        """ Adds a team to the back of the bucket for its lives.
+
+            :raises Exception: if the lives are not those of a bucket, or the queue is full
+            :complexity: Best/Worst O(1)
+        """
+        if not 0 < item.key < len(self.heads):
+            raise Exception("No bucket for this number of lives")
+        if self.free == -1:
+            raise Exception("Queue is full")
+        slot = self.free
+        self.free = self.next_slot[slot]
+        if self.compact:
+            self.ids[slot] = item.team_id
+            self.codes[slot] = item.code
+            self.lives[slot] = item.key
+            self.masks[slot] = item.mask
+        else:
+            self.teams[slot] = item
+        self.next_slot[slot] = -1
+        lives = item.key
+        if self.tails[lives] == -1:
+            self.heads[lives] = slot
+        else:
+            self.next_slot[self.tails[lives]] = slot
+        self.tails[lives] = slot
+        self.sizes[lives] += 1
+        self.length += 1
+        self.lowest = min(self.lowest, lives)
+
+    def serve(self) -> TowerTeam:
+        """ Deletes and returns the first team with the fewest lives.
+
+            :raises Exception: if the queue is empty
+            :complexity: Best O(1), Worst O(L), where L is the number of buckets
+        """
+        if self.is_empty():
+            raise Exception("Queue is empty")
+        while self.sizes[self.lowest] == 0:
+            self.lowest += 1
+        return self.serve_bucket(self.lowest)
+
+    def serve_bucket(self, lives: int) -> TowerTeam:
+        """ Deletes and returns the first team of the bucket for a number of lives.
+
+            :raises Exception: if the bucket is empty
+            :complexity: Best/Worst O(1), the PokeTeam of a compact queue is only created when the slot's value is
+                         used
+        """
+        if self.sizes[lives] == 0:
+            raise Exception("Queue is empty")
+        slot = self.heads[lives]
+        self.heads[lives] = self.next_slot[slot]
+        if self.heads[lives] == -1:
+            self.tails[lives] = -1
+        self.sizes[lives] -= 1
+        self.length -= 1
+        self.next_slot[slot] = self.free
+        self.free = slot
+        if self.compact:
+            return RosterSlot(self.ids[slot], self.codes[slot], self.lives[slot], self.masks[slot])
+        item = self.teams[slot]
+        self.teams[slot] = None
+        return item
+
+    def is_full(self) -> bool:
+        """ True if the queue holds as many teams as it was made for. """
+        return self.free == -1
+
+    def clear(self) -> None:
+        """ Clears all teams from the queue.
+            :complexity: Best/Worst O(L+n), where L is the number of buckets and n is the capacity
+        """
+        Queue.__init__(self)
+        size = len(self.next_slot)
+        for slot in range(size):
+            self.next_slot[slot] = slot + 1
+            if not self.compact:
+                self.teams[slot] = None
+        self.next_slot[size - 1] = -1
+        self.free = 0
+        for lives in range(len(self.heads)):
+            self.heads[lives] = -1
+            self.tails[lives] = -1
+            self.sizes[lives] = 0
+        self.lowest = 0
+
+    def keep_masks(self, require: int, forbid: int) -> list[int]:
+        """ Keeps only the teams of a compact queue whose composition bitmask has all the require bits and none of
+            the forbid bits
+
+            :param arg1: composition bits a team must all have
+            :param arg2: composition bits a team must not have any of
+            :raises Exception: if the queue is not compact
+            :complexity: Best/Worst O(L+n), where L is the number of buckets and n is the number of teams in the queue
+
+            The teams removed are unlinked from their bucket and their slots freed, without creating any RosterSlot.
+            The function returns the lives of the teams removed.
+        """
+        if not self.compact:
+            raise Exception("Only a compact queue keeps the masks of its teams")
+        removed = []
+        for lives in range(len(self.heads)):
+            previous = -1
+            slot = self.heads[lives]
+            while slot != -1:
+                following = self.next_slot[slot]
+                mask = self.masks[slot]
+                if mask & require == require and mask & forbid == 0:
+                    previous = slot
+                else:
+                    if previous == -1:
+                        self.heads[lives] = following
+                    else:
+                        self.next_slot[previous] = following
+                    if self.tails[lives] == slot:
+                        self.tails[lives] = previous
+                    self.next_slot[slot] = self.free
+                    self.free = slot
+                    self.sizes[lives] -= 1
+                    self.length -= 1
+                    removed.append(lives)
+                slot = following
+        return removed
+
+    def queues(self) -> list[Queue[TowerTeam]]:
+        """ Returns the buckets that have a team in order of lives, so each can be gone through by serving and
+            appending its teams
+            :complexity: Best/Worst O(L), where L is the number of buckets
+        """
+        return [LivesBucket(self, lives) for lives in range(len(self.sizes)) if self.sizes[lives] > 0]
+
+class LivesBucket(Queue[TowerTeam]):
+    """ The teams of a LivesQueue with one number of lives, as a queue of their own
+
+        Attributes:
+            lives_queue (LivesQueue): the queue the teams are in
+            lives (int): the lives of the teams
+    """
+
+    def __init__(self, lives_queue: LivesQueue, lives: int) -> None:
+        Queue.__init__(self)
+        self.lives_queue = lives_queue
+        self.lives = lives
+
+    def __len__(self) -> int:
+        """ Returns the number of teams in the bucket. """
+        return self.lives_queue.sizes[self.lives]
+
+    def append(self, item: TowerTeam) -> None:
+        """ Adds a team with the lives of this bucket to its back.
+
+            :raises Exception: if the team has other lives, or the LivesQueue is full
+            :complexity: Best/Worst O(1)
+        """
+        if item.key != self.lives:
+            raise Exception("The team does not have the lives of this bucket")
+        self.lives_queue.append(item)
+
+    def serve(self) -> TowerTeam:
+        """ Deletes and returns the team at the bucket's front.
+
+            :raises Exception: if the bucket is empty
+            :complexity: Best/Worst O(1)
+        """
+        return self.lives_queue.serve_bucket(self.lives)
+
+    def is_full(self) -> bool:
+        """ True if the LivesQueue is full and no team can be appended. """
+        return self.lives_queue.is_full()
+
+    def clear(self) -> None:
+        """ Clears all teams from the bucket.
+            :complexity: Best/Worst O(n), where n is the number of teams in the bucket
+        """
+        while not self.is_empty():
+            self.serve()
+
+def _queues(tower_lst: Queue[TowerTeam]) -> list[Queue[TowerTeam]]:
+    """ Returns the queues that hold the teams of a tower, each of which keeps its order when every team in it is
+        served and appended back once
+
+        :complexity: Best/Worst O(L), where L is the number of buckets of a LivesQueue
+    """
+    if isinstance(tower_lst, LivesQueue):
+        return tower_lst.queues()
+    return [tower_lst]
 
 class BattleTower:
 
@@ -28,6 +433,7 @@ class BattleTower:
         self.battle = battle
         self.my_team = None
         self.tower_team_lst = None
+        self.lives_count = None
 
     def get_my_team(self) -> PokeTeam:
         """ Returns the team
@@ -62,30 +468,131 @@ class BattleTower:
             :complexity: Best/Worst O(1), since every operation is constant time
         """
         self.tower_team_lst = lst
+        self.lives_count = None
+
+    def get_roster(self) -> list[tuple[int, int]]:
+        """ Returns the (configuration code, lives) of every team in the tower, in the order they will be faced
+
+            :complexity: Best/Worst O(n), where n is the number of teams in the tower
+        """
+        roster = []
+        for queue in _queues(self.tower_team_lst):
+            for _ in range(len(queue)):
+                team = queue.serve()
+                code = team.code if isinstance(team, RosterSlot) else team.value.get_config_code()
+                roster.append((code, team.key))
+                queue.append(team)
+        return roster
+
+    def set_roster(self, roster: list[tuple[int, int]]) -> None:
+        """ Fills the tower with freshly generated teams from (configuration code, lives) pairs
+
+            :param args: a list of (configuration code, lives) such as the one returned by get_roster
+            :complexity: Best/Worst O(n*r), where n is len(roster) and r is the complexity of creating a PokeTeam
+        """
+        self.tower_team_lst = CircularQueue(len(roster))
+        self.lives_count = None
+        for i in range(len(roster)):
+            code, lives = roster[i]
+            team = PokeTeam.from_config_code(f"Team {i}", code)
+            self.tower_team_lst.append(TowerTeam(team, lives, composition_mask(code), i))
+
+    def set_compact_roster(self, roster: list[tuple[int, int]]) -> None:
+        """ Fills the tower with a CompactRoster from (configuration code, lives) pairs, without creating any PokeTeam
+
+            :param args: a list of (configuration code, lives) such as the one returned by get_roster
+            :complexity: Best/Worst O(n), where n is len(roster)
+        """
+        self.tower_team_lst = CompactRoster(len(roster))
+        self.lives_count = None
+        for i in range(len(roster)):
+            code, lives = roster[i]
+            self.tower_team_lst.append_team(i, code, lives, composition_mask(code))
+
+    def get_lives_count(self) -> ArrayR[int]:
+        """ Returns how many teams have each number of lives, counting them first if they are not known yet
+
+            :complexity: Best O(1) when the counts are kept up to date, Worst O(n) otherwise, where n is the number of
+                         teams in the tower
+        """
+        if self.lives_count is None:
+            max_lives = 0
+            for queue in _queues(self.tower_team_lst):
+                for _ in range(len(queue)):
+                    team = queue.serve()
+                    max_lives = max(max_lives, team.key)
+                    queue.append(team)
+            self.lives_count = ArrayR(max_lives + 1)
+            for lives in range(max_lives + 1):
+                self.lives_count[lives] = 0
+            for queue in _queues(self.tower_team_lst):
+                for _ in range(len(queue)):
+                    team = queue.serve()
+                    self.lives_count[team.key] += 1
+                    queue.append(team)
+        return self.lives_count
+
+    def _remove_life(self, lives: int) -> None:
+        """ Moves a team from the count of lives to the count of lives - 1, 0 lives means it left the tower
+
+            :complexity: Best/Worst O(1)
+        """
+        if self.lives_count is not None:
+            self.lives_count[lives] -= 1
+            if lives > 1:
+                self.lives_count[lives - 1] += 1
+
+    def _remove_team(self, lives: int) -> None:
+        """ Removes a team with the given lives from the counts
+
+            :complexity: Best/Worst O(1)
+        """
+        if self.lives_count is not None:
+            self.lives_count[lives] -= 1
     
-    def generate_teams(self, n: int) -> None:
+    def generate_teams(self, n: int, compact: bool = False) -> None:
         """ Generates a random PokeTeam
         
             :pre: n should be an integer more than 0
             :post: n should not be modified
-            :param args: an integer indicating the number of teams to generate
+            :param arg1: an integer indicating the number of teams to generate
+            :param arg2: keep the teams in a CompactRoster, so a PokeTeam only exists while it is battling
             :raises ValueError: if the argument is not integer or more than 0
             :complexity: Best/Worst O(n), where n is the number of teams to be generated
+
+            Both ways of storing the teams use the same random numbers, so the tower plays out the same.
         """
         if not type(n) == int or n < 0:
             raise ValueError("number must be a positive integer")
 
-        self.tower_team_lst = CircularQueue(n)
+        self.tower_team_lst = CompactRoster(n) if compact else CircularQueue(n)
+        self.lives_count = ArrayR(MAX_LIVES + 1)
+        for lives in range(MAX_LIVES + 1):
+            self.lives_count[lives] = 0
         for i in range(n):  # O(n), n is the number of teams to generate
             battle_mode = RandomGen.randint(0, 1)
-            team = PokeTeam.random_team(f"Team {i}", battle_mode)
-            no_of_lives = RandomGen.randint(2, 10)
-            self.tower_team_lst.append(ListItem(team, no_of_lives))
+            if compact:
+                code = PokeTeam.random_config(battle_mode)
+                no_of_lives = RandomGen.randint(MIN_LIVES, MAX_LIVES)
+                self.tower_team_lst.append_team(i, code, no_of_lives, composition_mask(code))
+            else:
+                team = PokeTeam.random_team(f"Team {i}", battle_mode)
+                no_of_lives = RandomGen.randint(MIN_LIVES, MAX_LIVES)
+                self.tower_team_lst.append(TowerTeam(team, no_of_lives, composition_mask(team.get_config_code()), i))
+            self.lives_count[no_of_lives] += 1
 
     def __iter__(self):
         """ Magic method returns an iterator object that goes through each element of the given object. """
         return BattleTowerIterator(self)
 
+    def run_to_completion(self, store=None) -> dict:
+        """ Plays the whole tower and returns a summary, see BattleTowerIterator.run_to_completion
+
+            :complexity: Best/Worst O(n+K*B), where n is the number of teams, K is the number of battles and B is the
+                         complexity of battle.
+        """
+        return iter(self).run_to_completion(store)
+
 class BattleTowerIterator:
 
     def __init__(self, battle_tower) -> None:
@@ -119,6 +626,7 @@ class BattleTowerIterator:
             battle_res = self.battle_tower.battle.battle(player_team, tower_team.value)
 
             if battle_res == 1:
+                self.battle_tower._remove_life(tower_team.key)
                 tower_team.key -= 1
             else:
                 self.defeat = True
@@ -132,25 +640,148 @@ class BattleTowerIterator:
         else:
             raise StopIteration
 
+    def run_to_completion(self, store=None) -> dict:
+        """ Performs every remaining battle in the tower and returns the aggregate results
+
+            :param args: a ResultStore every battle is added to, with the seed it started from
+
+            :complexity: Best/Worst O(N+K*B), where N is the number of trainers remaining in the battle tower, K is the
+                         number of battles and B is the complexity of battle.
+
+            The battles are the same ones, in the same order and with the same random numbers, as calling __next__
+            until StopIteration, but no result tuple is built per battle. Trainers are numbered by their position in
+            the tower when the run starts. The function returns a dictionary with
+                battles: the number of battles fought
+                defeated_at: the index of the battle the player lost, or None if the tower was cleared
+                team_ids: the team id of the trainer at each position, "Team {id}" for generated teams
+                lives: the lives left for the trainer at each position
+                wins: the number of battles the player won against the trainer at each position
+            Trainers given through set_tower_team have no team id, so they are given ids after the largest one.
+        """
+        player_team = self.battle_tower.get_my_team()
+        tower_team_lst = self.battle_tower.get_tower_team_lst()
+        battle = self.battle_tower.battle.battle
+        remove_life = self.battle_tower._remove_life
+
+        next_id = 0
+        for queue in _queues(tower_team_lst):
+            for _ in range(len(queue)):
+                tower_team = queue.serve()
+                if getattr(tower_team, "team_id", None) is not None:
+                    next_id = max(next_id, tower_team.team_id + 1)
+                queue.append(tower_team)
+
+        size = len(tower_team_lst)
+        team_ids = array("I", bytes(4 * size))
+        lives = array("B", bytes(size))
+        wins = array("I", bytes(4 * size))
+        position = 0
+        for queue in _queues(tower_team_lst):
+            for _ in range(len(queue)):
+                tower_team = queue.serve()
+                if getattr(tower_team, "team_id", None) is None:
+                    tower_team.team_id = next_id
+                    next_id += 1
+                team_ids[position] = tower_team.team_id
+                lives[position] = tower_team.key
+                position += 1
+                queue.append(tower_team)
+        position_of = array("I", bytes(4 * next_id))
+        for position in range(size):
+            position_of[team_ids[position]] = position
+
+        battles = 0
+        defeated_at = None
+        player_code = player_team.get_config_code() if store is not None else 0
+        while not tower_team_lst.is_empty() and not self.defeat:
+            tower_team = tower_team_lst.serve()
+            team = tower_team.value
+            position = position_of[tower_team.team_id]
+
+            player_team.regenerate_team()
+            team.regenerate_team()
+            seed = RandomGen.seed
+            battle_res = battle(player_team, team)
+            if store is not None:
+                store.add(player_code, team.get_config_code(), battle_res, seed, self.battle_tower.battle.turn_count,
+                          "tower")
+
+            if battle_res == 1:
+                remove_life(tower_team.key)
+                tower_team.key -= 1
+                wins[position] += 1
+            else:
+                self.defeat = True
+                defeated_at = battles
+            battles += 1
+
+            lives[position] = tower_team.key
+            if tower_team.key != 0:
+                tower_team_lst.append(tower_team)
+
+        return {"battles": battles, "defeated_at": defeated_at, "team_ids": team_ids, "lives": lives, "wins": wins}
+
     def avoid_duplicates(self):
         """ Removes all currently alive trainers who have multiple pokemon of the same type
             
-            :complexity: Best/Worst O(N*P), where N is the number of trainers remaining in the battle tower and
-                         P is the limit on the number of pokemon per team.
+            :complexity: Best/Worst O(N), where N is the number of trainers remaining in the battle tower.
+        """
+        self.filter_teams(forbid=DUPLICATE_BITS)
+
+    def filter_teams(self, require: int = 0, forbid: int = 0) -> None:
+        """ Keeps only the currently alive trainers whose composition matches the given bits
+
+            :param arg1: composition bits a trainer must all have
+            :param arg2: composition bits a trainer must not have any of
+            :complexity: Best/Worst O(N), where N is the number of trainers remaining in the battle tower.
+
+            Each trainer is checked with a single mask operation on its composition bitmask (see composition_mask), so
+            no team is rescanned. For example, filter_teams(require=1 << PokeType.GHOST.value, forbid=size_bit(6))
+            keeps the trainers with a ghost type pokemon and fewer than 6 pokemon. A compact tower is filtered on its
+            arrays of masks, see CompactRoster.keep_masks, other towers by serving and appending back every trainer.
         """
         tower_lst = self.battle_tower.get_tower_team_lst()
-        for _ in range(len(tower_lst)):
-            count = 0
-            team = tower_lst.serve()
-            for num in team.value.get_team_numbers():
-                if num > 1:
-                    count += 1
-            if count == 0:
-                tower_lst.append(team)
+        if isinstance(tower_lst, CompactRoster) or isinstance(tower_lst, LivesQueue) and tower_lst.compact:
+            for lives in tower_lst.keep_masks(require, forbid):
+                self.battle_tower._remove_team(lives)
+            return
+        for queue in _queues(tower_lst):
+            for _ in range(len(queue)):
+                team = queue.serve()
+                mask = self._team_mask(team)
+                if mask & require == require and mask & forbid == 0:
+                    queue.append(team)
+                else:
+                    self.battle_tower._remove_team(team.key)
+
+    def _team_mask(self, team: ListItem) -> int:
+        """ Returns the composition bitmask of a trainer, working it out for trainers given through set_tower_team
+            :complexity: Best/Worst O(1)
+        """
+        if isinstance(team, TowerTeam):
+            return team.mask
+        return composition_mask(team.value.get_config_code())
 
     def sort_by_lives(self):
-        # 1054
-        raise NotImplementedError()
+        """ Sorts the remaining trainers so the ones with the fewest lives are faced first, and keeps them sorted
+
+            :complexity: Best O(1) when the tower is already a LivesQueue, Worst O(L+N) otherwise, where N is the
+                         number of trainers remaining in the battle tower and L is the most lives a trainer has.
+
+            Lives are small integers, so every trainer is served into a LivesQueue, a bucket queue with one bucket
+            per number of lives that becomes the tower. Trainers with the same lives keep their order. __next__
+            appends a trainer that lost a life to the back of the bucket below, so the tower stays sorted as the
+            battles go on and sorting it again does nothing. The LivesQueue of a CompactRoster keeps its trainers as
+            numbers too, so no PokeTeam is kept for a waiting trainer.
+        """
+        tower_lst = self.battle_tower.get_tower_team_lst()
+        if isinstance(tower_lst, LivesQueue):
+            return
+
+        buckets = LivesQueue(self.battle_tower.get_lives_count(), isinstance(tower_lst, CompactRoster))
+        while not tower_lst.is_empty():
+            buckets.append(tower_lst.serve())
+        self.battle_tower.tower_team_lst = buckets
 
 
 if __name__ == "__main__":
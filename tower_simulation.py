@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+"""
+Estimates how likely a team is to clear a battle tower by simulating the tower many times with different seeds.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from battle import Battle
+from battle_stats import wilson_interval
+from dashboard import BattleBoard
+from poke_team import PokeTeam
+from random_gen import RandomGen
+from tower import BattleTower
+
+
+def simulate_tower(my_team_code: int, roster: list[tuple[int, int]], seed: int, board=None) -> int:
+    """ Plays one battle tower from scratch.
+
+        :param arg1: configuration code of the player's team
+        :param arg2: (configuration code, lives) of every tower team, see BattleTower.get_roster
+        :param arg3: seed for RandomGen
+        :param arg4: a BattleBoard, or the BoardChannel of one, to show the tower on
+        :complexity: Best/Worst O(n+K*B), where n is len(roster), K is the number of battles and B is the complexity
+                     of battle.
+
+        The function returns the index of the battle the player lost, or -1 if the tower was cleared. On a board, every
+        process has one panel, keyed by its process id, whose result is a win for team 1 when the tower was cleared.
+    """
+    RandomGen.set_seed(seed)
+    slot = None if board is None else board.slot(os.getpid(), f"Tower {seed}")
+    tower = BattleTower(Battle(renderer=slot))
+    tower.set_my_team(PokeTeam.from_config_code("Player", my_team_code))
+    tower.set_roster(roster)
+    defeated_at = tower.run_to_completion()["defeated_at"]
+    if slot is not None:
+        slot.finish(1 if defeated_at is None else 2)
+    return -1 if defeated_at is None else defeated_at
+
+
+def _simulate_batch(my_team_code: int, roster: list[tuple[int, int]], seeds: list[int], board=None) -> list[int]:
+    """ Plays a batch of towers in a worker process.
+        :complexity: Best/Worst O(len(seeds)) towers
+    """
+    return [simulate_tower(my_team_code, roster, seed, board) for seed in seeds]
+
+
+def clearance_probability(my_team_code: int, roster: list[tuple[int, int]], simulations: int = 1000, seed: int = 0,
+                          max_workers: int | None = None, batch_size: int = 32, tolerance: float = 0.02,
+                          threshold: float | None = None, board: BattleBoard | None = None) -> dict:
+    """ Estimates the probability that a team clears a tower.
+
+        :param arg1: configuration code of the player's team
+        :param arg2: (configuration code, lives) of every tower team, see BattleTower.get_roster
+        :param arg3: the most towers to simulate
+        :param arg4: base seed, tower i is played with RandomGen.derive_seed(seed, i)
+        :param arg5: number of worker processes, 1 plays every tower in this process
+        :param arg6: number of towers sent to a worker at once
+        :param arg7: stop once the 95% interval is narrower than 2 * tolerance
+        :param arg8: also stop once the 95% interval is entirely above or below this probability
+        :param arg9: a BattleBoard to show the tower every worker is playing on
+        :complexity: Best/Worst O(K*T), where K is the number of towers simulated and T is the complexity of
+                     simulate_tower, spread over the workers.
+
+        Batches are checked in order, so the result only depends on the arguments and never on how fast each worker
+        is. The function returns a dictionary with
+            simulations: the number of towers simulated
+            cleared: the number of towers cleared
+            probability: the fraction of towers cleared
+            interval: the 95% Wilson interval of the probability
+            defeats: for each battle index, the number of towers lost at that battle
+    """
+    num_batches = (simulations + batch_size - 1) // batch_size
+    summary = {"simulations": 0, "cleared": 0, "probability": 0.0, "interval": (0.0, 1.0), "defeats": {}}
+
+    def batch_seeds(batch_idx):
+        first = batch_idx * batch_size
+        return [RandomGen.derive_seed(seed, sim_idx) for sim_idx in range(first, min(first + batch_size, simulations))]
+
+    def add_batch(results):
+        """ Adds a batch to the summary and returns True if the estimate is settled. """
+        for defeated_at in results:
+            summary["simulations"] += 1
+            if defeated_at == -1:
+                summary["cleared"] += 1
+            else:
+                summary["defeats"][defeated_at] = summary["defeats"].get(defeated_at, 0) + 1
+        low, high = wilson_interval(summary["cleared"], summary["simulations"])
+        summary["probability"] = summary["cleared"] / summary["simulations"]
+        summary["interval"] = (low, high)
+        summary["defeats"] = dict(sorted(summary["defeats"].items()))
+        if high - low <= 2 * tolerance:
+            return True
+        return threshold is not None and (low > threshold or high < threshold)
+
+    if max_workers == 1:
+        saved_seed = RandomGen.seed
+        for batch_idx in range(num_batches):
+            if add_batch(_simulate_batch(my_team_code, roster, batch_seeds(batch_idx), board)):
+                break
+        RandomGen.seed = saved_seed
+        return summary
+
+    channel = None if board is None else board.channel()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        max_in_flight = 2 * (max_workers or os.cpu_count() or 1)
+        running = {}
+        finished = {}
+        next_batch = 0
+        next_to_add = 0
+        settled = False
+        while not settled and next_to_add < num_batches:
+            while next_batch < num_batches and len(running) < max_in_flight:
+                future = pool.submit(_simulate_batch, my_team_code, roster, batch_seeds(next_batch), channel)
+                running[future] = next_batch
+                next_batch += 1
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[running.pop(future)] = future.result()
+            while not settled and next_to_add in finished:
+                settled = add_batch(finished.pop(next_to_add))
+                next_to_add += 1
+        for future in running:
+            future.cancel()
+    return summary
+
+
+if __name__ == "__main__":
+    RandomGen.set_seed(29183712400123)
+    bt = BattleTower(Battle(verbosity=0))
+    bt.generate_teams(10)
+    my_team = PokeTeam.random_team("Jackson", 0, team_size=6)
+    print(clearance_probability(my_team.get_config_code(), bt.get_roster(), simulations=2000, seed=1))
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+"""
+Writes every turn of a battle as one JSON object per line, for logs that are read by programs rather than people.
+"""
+
+import json
+import sys
+
+JSON_LINES = -1
+BUFFER_SIZE = 1 << 20
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class TurnLog:
+    """ Buffered JSON Lines writer for battle turns.
+
+        Attributes:
+            file: the file the records are written to
+            battles (int): number of battles started, used as the id of the next one
+            owns_file (bool): True if the file was opened here and has to be closed here
+
+        Every turn is a record {"battle", "turn", "actions", "team1", "team2"}, where the actions are the names of the
+        actions the two teams chose (null before the first turn) and each team is {"species", "hp", "max_hp", "level",
+        "status", "remaining"} for its current pokemon. The end of a battle is a record {"battle", "turn", "result"}.
+    """
+
+    def __init__(self, file=None, buffer_size: int = BUFFER_SIZE) -> None:
+        """ Initialisation
+
+            :param arg1: path of the file to write, or an open text file, the standard output if not given
+            :param arg2: size of the write buffer when a path is given
+            :complexity: Best/Worst O(1)
+        """
+        if isinstance(file, str):
+            self.file = open(file, "w", buffering=buffer_size, encoding="utf-8")
+            self.owns_file = True
+        else:
+            self.file = sys.stdout if file is None else file
+            self.owns_file = False
+        self.battles = 0
+
+    def __enter__(self) -> TurnLog:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start_battle(self) -> int:
+        """ Returns the id of a new battle.
+            :complexity: Best/Worst O(1)
+        """
+        self.battles += 1
+        return self.battles - 1
+
+    def write_turn(self, battle_id: int, turn: int, actions: tuple[str, str] | None, team1: dict, team2: dict) -> None:
+        """ Writes the record of a turn.
+            :complexity: Best/Worst O(1)
+        """
+        self.file.write(_encode({"battle": battle_id, "turn": turn, "actions": actions, "team1": team1,
+                                 "team2": team2}) + "\n")
+
+    def write_result(self, battle_id: int, turn: int, battle_res: int) -> None:
+        """ Writes the record of the end of a battle.
+            :complexity: Best/Worst O(1)
+        """
+        self.file.write(_encode({"battle": battle_id, "turn": turn, "result": battle_res}) + "\n")
+
+    def flush(self) -> None:
+        """ Writes out the buffered records. """
+        self.file.flush()
+
+    def close(self) -> None:
+        """ Writes out the buffered records, closing the file if it was opened here. """
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()